@@ -0,0 +1,112 @@
+"""Vectorised engagement analytics over the metric time series."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import time, tzinfo
+from typing import List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import timeseries
+from .models import Video
+from .timezones import utc_offsets
+
+HOURS_PER_WEEK = 7 * 24
+
+
+@dataclass
+class PostStats:
+    """Per-post arrays aligned on ``video_ids``."""
+
+    video_ids: np.ndarray
+    velocity: np.ndarray  # likes + comments gained per hour in the window
+    hour_of_week: np.ndarray  # 0 = Monday 00:00 local time
+
+
+def engagement_velocity(
+    arrays: dict[str, np.ndarray],
+    posted_ts: np.ndarray | None = None,
+    window_hours: float = 24,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(video_ids, velocity)`` from samples sorted by ``(video_id, ts)``.
+
+    Velocity is engagement gained per hour over the first ``window_hours``.
+    With ``posted_ts`` (aligned on the unique ids) growth is measured from
+    zero at publish time; otherwise from each post's first sample.
+    """
+    vid, ts = arrays["video_id"], arrays["ts"]
+    if not len(vid):
+        return vid, np.empty(0)
+    eng = arrays["likes"] + arrays["comments"]
+    starts = np.flatnonzero(np.r_[True, vid[1:] != vid[:-1]])
+    sizes = np.diff(np.r_[starts, len(vid)])
+
+    if posted_ts is None:
+        origin_ts, origin_eng = ts[starts], eng[starts]
+    else:
+        origin_ts, origin_eng = posted_ts, np.zeros(len(starts), dtype=eng.dtype)
+
+    # Samples are time-ordered within a post, so the window is a prefix.
+    in_window = ts <= np.repeat(origin_ts, sizes) + int(window_hours * 3600)
+    counts = np.add.reduceat(in_window.astype(np.int64), starts)
+    last = starts + np.maximum(counts, 1) - 1
+    hours = (ts[last] - origin_ts) / 3600.0
+    gained = (eng[last] - origin_eng).astype(float)
+    velocity = np.divide(gained, hours, out=np.zeros_like(gained), where=hours > 0)
+    return vid[starts], velocity
+
+
+def post_stats(session: Session, tz: tzinfo, window_hours: float = 24, since: int | None = None) -> PostStats:
+    """Compute velocity and local posting hour-of-week for every sampled post."""
+    arrays = timeseries.load_arrays(session, since=since, window=int(window_hours * 3600))
+    rows = session.query(Video.id, Video.posted_at).filter(Video.posted_at.isnot(None)).order_by(Video.id).all()
+    posted_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    posted_all = np.array([r[1] for r in rows], dtype="datetime64[s]").astype(np.int64)
+
+    keep = np.isin(arrays["video_id"], posted_ids)
+    arrays = {k: v[keep] for k, v in arrays.items()}
+    ids = np.unique(arrays["video_id"])
+    posted_ts = posted_all[np.searchsorted(posted_ids, ids)]
+    how = hour_of_week(posted_ts, tz)
+
+    video_ids, velocity = engagement_velocity(arrays, posted_ts, window_hours)
+    return PostStats(video_ids, velocity, how)
+
+
+def hour_of_week(ts: np.ndarray, tz: tzinfo) -> np.ndarray:
+    """Local hour-of-week (0 = Monday 00:00) of Unix timestamps ``ts``."""
+    local = ts + utc_offsets(ts, tz)
+    days = local // 86400
+    # 1970-01-01 was a Thursday (weekday 3).
+    return (days + 3) % 7 * 24 + (local % 86400) // 3600
+
+
+def hour_of_week_profile(stats: PostStats, min_posts: int = 1) -> np.ndarray:
+    """Mean velocity per hour-of-week (168 bins); NaN where data is too thin."""
+    counts = np.bincount(stats.hour_of_week, minlength=HOURS_PER_WEEK)
+    sums = np.bincount(stats.hour_of_week, weights=stats.velocity, minlength=HOURS_PER_WEEK)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / counts
+    mean[counts < max(min_posts, 1)] = np.nan
+    return mean
+
+
+def best_hours_of_week(stats: PostStats, top: int = 10, min_posts: int = 3) -> List[tuple[int, int, float]]:
+    """Return the ``top`` ``(weekday, hour, mean_velocity)`` slots, best first."""
+    profile = hour_of_week_profile(stats, min_posts)
+    valid = np.flatnonzero(~np.isnan(profile))
+    order = valid[np.argsort(profile[valid])[::-1][:top]]
+    return [(int(h // 24), int(h % 24), float(profile[h])) for h in order]
+
+
+def suggest_template(stats: PostStats, slots: int = 5, min_posts: int = 3) -> List[time]:
+    """Pick the ``slots`` best hours of the day as a daily schedule template."""
+    hours = stats.hour_of_week % 24
+    counts = np.bincount(hours, minlength=24)
+    sums = np.bincount(hours, weights=stats.velocity, minlength=24)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = sums / counts
+    mean[counts < max(min_posts, 1)] = -np.inf
+    ranked = [int(h) for h in np.argsort(mean)[::-1] if np.isfinite(mean[h])]
+    return sorted(time(h, 0) for h in ranked[:slots])
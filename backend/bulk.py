@@ -0,0 +1,142 @@
+"""Bulk actions on many videos, each in a single job and transaction.
+
+Every action takes ``(session, video_ids, progress=None, **options)`` and
+returns a :class:`BulkResult`. ``progress(done, total)`` is called as items
+complete so a GUI or worker process can report it. Actions are listed in
+``ACTIONS`` by name so callers can dispatch them without importing each one.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import send2trash
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from . import scheduler, slots
+from .instagram import post_to_instagram
+from .models import Video
+
+ProgressFn = Optional[Callable[[int, int], None]]
+
+
+@dataclass
+class BulkResult:
+    """IDs that succeeded and per-ID error messages."""
+
+    action: str
+    done: List[int] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+
+
+def _report(progress: ProgressFn, done: int, total: int) -> None:
+    if progress:
+        progress(done, total)
+
+
+def bulk_schedule(
+    session: Session,
+    video_ids: Sequence[int],
+    progress: ProgressFn = None,
+    template: Sequence[time] = (),
+    settings: dict | None = None,
+) -> BulkResult:
+    """Assign the next free template slots to the unposted, active ``video_ids``.
+
+    Posted and deleted videos are skipped and reported as errors.
+    """
+    settings = settings if settings is not None else getattr(session, "settings", {})
+    assignment = slots.schedule_videos(session, video_ids, template, settings)
+    _report(progress, len(video_ids), len(video_ids))
+    result = BulkResult("schedule", list(assignment))
+    for vid in video_ids:
+        if vid not in assignment:
+            result.errors[vid] = "Already posted or deleted"
+    return result
+
+
+def bulk_unschedule(session: Session, video_ids: Sequence[int], progress: ProgressFn = None) -> BulkResult:
+    """Clear ``scheduled_at`` on the unposted videos among ``video_ids``."""
+    ids = list(video_ids)
+    session.execute(
+        update(Video)
+        .where(Video.id.in_(ids), Video.posted_at.is_(None))
+        .values(scheduled_at=None)
+    )
+    session.commit()
+    _report(progress, len(ids), len(ids))
+    return BulkResult("unschedule", ids)
+
+
+def bulk_delete(session: Session, video_ids: Sequence[int], progress: ProgressFn = None) -> BulkResult:
+    """Move the files to the recycle bin, then soft-delete and unschedule the records."""
+    result = BulkResult("delete")
+    rows = session.query(Video.id, Video.file_path).filter(Video.id.in_(list(video_ids))).all()
+    for n, (vid, path) in enumerate(rows, 1):
+        try:
+            send2trash.send2trash(path)
+            result.done.append(vid)
+        except FileNotFoundError:
+            result.done.append(vid)  # already gone; still drop the record
+        except Exception as exc:  # pragma: no cover - OS errors
+            result.errors[vid] = str(exc)
+        _report(progress, n, len(rows))
+    if result.done:
+        session.execute(
+            update(Video).where(Video.id.in_(result.done)).values(is_active=False, scheduled_at=None)
+        )
+    session.commit()
+    return result
+
+
+def bulk_post(
+    session: Session,
+    video_ids: Sequence[int],
+    progress: ProgressFn = None,
+    settings: dict | None = None,
+) -> BulkResult:
+    """Publish the unposted, active videos among ``video_ids`` now, oldest ID first.
+
+    Like the scheduler, stops at ``max_posts_per_day``; the rest are
+    reported as errors. Each publish holds the scheduler's post lock and
+    re-checks the video first, so a post due at the same moment goes out
+    once. Each publish is committed as soon as it succeeds: a published
+    post cannot be rolled back, so it must never be lost to a later failure.
+    """
+    settings = settings if settings is not None else getattr(session, "settings", {})
+    max_posts = settings.get("max_posts_per_day", 25)
+    result = BulkResult("post")
+    videos = (
+        session.query(Video)
+        .filter(Video.id.in_(list(video_ids)), Video.posted_at.is_(None), Video.is_active.is_(True))
+        .order_by(Video.id)
+        .all()
+    )
+    for n, video in enumerate(videos, 1):
+        with scheduler._POST_LOCK:
+            session.refresh(video)  # the scheduler may have posted it meanwhile
+            if video.posted_at is not None or not video.is_active:
+                result.errors[video.id] = "Already posted or deleted"
+            elif scheduler.daily_allowance(session, max_posts) <= 0:
+                result.errors[video.id] = f"Daily limit of {max_posts} posts reached"
+            else:
+                try:
+                    post_to_instagram(session, video)
+                    video.posted_at = datetime.utcnow()
+                    result.done.append(video.id)
+                except Exception as exc:  # pragma: no cover - network errors
+                    video.last_error = str(exc)
+                    result.errors[video.id] = str(exc)
+            session.commit()
+        _report(progress, n, len(videos))
+    return result
+
+
+ACTIONS: Dict[str, Callable[..., BulkResult]] = {
+    "schedule": bulk_schedule,
+    "unschedule": bulk_unschedule,
+    "delete": bulk_delete,
+    "post": bulk_post,
+}
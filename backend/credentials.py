@@ -0,0 +1,141 @@
+"""Cached access to the long-lived Instagram token.
+
+Reading from ``keyring`` can be a slow D-Bus round-trip (and may block on a
+locked Secret Service collection), so :class:`CredentialManager` keeps the
+token in memory for ``ttl`` seconds and serves it lock-free in between. It
+also tracks the token's expiry and exchanges it for a fresh long-lived token
+once it is within ``refresh_margin`` of expiring.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import keyring
+import requests
+from keyring.errors import KeyringError, PasswordDeleteError
+
+SERVICE = "ig_scheduler"
+TOKEN_KEY = "long_lived_token"
+EXPIRY_KEY = "long_lived_token_expires_at"
+APP_SECRET_KEY = "app_secret"
+
+LOG = logging.getLogger(__name__)
+
+
+class CredentialManager:
+    """Thread-safe, TTL-cached view of the token stored in ``keyring``."""
+
+    def __init__(self, service: str = SERVICE, ttl: float = 600.0, refresh_margin: float = 7 * 86400):
+        self.service = service
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._token: str | None = None
+        self._expires_at: float | None = None
+        self._loaded_at = float("-inf")
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    def get_token(self) -> str | None:
+        """Return the cached token, re-reading ``keyring`` once the TTL lapses."""
+        if time.monotonic() - self._loaded_at < self.ttl:
+            return self._token
+        with self._lock:
+            if time.monotonic() - self._loaded_at >= self.ttl:
+                self._load()
+            return self._token
+
+    @property
+    def expires_at(self) -> float | None:
+        """Unix timestamp at which the token expires, if known."""
+        self.get_token()
+        return self._expires_at
+
+    def invalidate(self) -> None:
+        """Force the next :meth:`get_token` to read from ``keyring``."""
+        with self._lock:
+            self._loaded_at = float("-inf")
+
+    def set_token(self, token: str, expires_in: float | None = None) -> None:
+        """Store ``token`` in ``keyring`` and the cache."""
+        expires_at = time.time() + expires_in if expires_in else None
+        with self._lock:
+            keyring.set_password(self.service, TOKEN_KEY, token)
+            if expires_at is not None:
+                keyring.set_password(self.service, EXPIRY_KEY, str(int(expires_at)))
+            else:
+                try:
+                    keyring.delete_password(self.service, EXPIRY_KEY)
+                except PasswordDeleteError:
+                    pass
+            self._token = token
+            self._expires_at = expires_at
+            self._loaded_at = time.monotonic()
+
+    def _load(self) -> None:
+        try:
+            token = keyring.get_password(self.service, TOKEN_KEY)
+            expiry = keyring.get_password(self.service, EXPIRY_KEY)
+        except KeyringError as exc:
+            # Locked or unavailable keyring: keep serving what we had.
+            LOG.warning("keyring unavailable, using cached token: %s", exc)
+            self._loaded_at = time.monotonic()
+            return
+        self._token = token
+        try:
+            self._expires_at = float(expiry) if expiry else None
+        except ValueError:
+            self._expires_at = None
+        self._loaded_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    def needs_refresh(self, now: float | None = None) -> bool:
+        """True when the token expires within ``refresh_margin`` or its expiry is unknown."""
+        if not self.get_token():
+            return False
+        if self._expires_at is None:
+            return True
+        now = time.time() if now is None else now
+        return self._expires_at - now <= self.refresh_margin
+
+    def refresh(self, app_id: str, api: str) -> str:
+        """Exchange the current token for a new long-lived one."""
+        token = self.get_token()
+        secret = keyring.get_password(self.service, APP_SECRET_KEY)
+        if not token or not app_id or not secret:
+            raise RuntimeError("Token refresh needs a token, app ID and app secret")
+        r = requests.get(
+            f"{api}/oauth/access_token",
+            params={
+                "grant_type": "fb_exchange_token",
+                "client_id": app_id,
+                "client_secret": secret,
+                "fb_exchange_token": token,
+            },
+            timeout=30,
+        )
+        r.raise_for_status()
+        data = r.json()
+        self.set_token(data["access_token"], data.get("expires_in"))
+        return data["access_token"]
+
+    def refresh_if_needed(self, settings: dict, api: str) -> bool:
+        """Refresh when close to expiry; returns whether a refresh happened."""
+        app_id = settings.get("app_id", "")
+        if not app_id or not self.needs_refresh():
+            return False
+        self.refresh(app_id, api)
+        return True
+
+
+CREDENTIALS = CredentialManager()
+
+
+def get_token() -> str | None:
+    """Cheap, thread-safe accessor used by every Graph API call."""
+    return CREDENTIALS.get_token()
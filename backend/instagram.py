@@ -9,14 +9,34 @@ import socketserver
 import tempfile
 import threading
 import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
-import keyring
 import requests
 
-from .models import Video
+from . import credentials, telemetry, timeseries
+from .models import StagedContainer, Video
+
+DEFAULT_API = "https://graph.facebook.com/v21.0"
+API = DEFAULT_API
+# Seconds between container status checks while Instagram processes a video.
+STATUS_POLL_SECONDS = 10.0
+# Instagram discards unpublished containers after 24 hours.
+CONTAINER_TTL = timedelta(hours=24)
+# Timeout for the quick status and publish calls.
+REQUEST_TIMEOUT = 30
+
+
+def set_api_base(url: str | None = None) -> str:
+    """Point all Graph API calls at ``url`` (``None`` restores the default).
+
+    Returns the previous base URL so callers can restore it.
+    """
+    global API
+    previous = API
+    API = (url or DEFAULT_API).rstrip("/")
+    return previous
 
-API = "https://graph.facebook.com/v21.0"
 
 # ---------------------------------------------------------------------------
 # Local HTTP server to expose files to the Instagram API
@@ -27,14 +47,31 @@ _THREAD: threading.Thread | None = None
 _PORT: int | None = None
 
 
+class _MediaHandler(http.server.SimpleHTTPRequestHandler):
+    """Serve staged media plus the OpenMetrics ``/metrics`` endpoint."""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            return super().do_GET()
+        body = telemetry.render_openmetrics().encode()
+        self.send_response(200)
+        self.send_header(
+            "Content-Type",
+            "application/openmetrics-text; version=1.0.0; charset=utf-8",
+        )
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
 def start_http_server(port: int = 0) -> int:
-    """Start a background HTTP server serving ``SERVE_DIR``."""
+    """Start a background HTTP server serving ``SERVE_DIR`` and ``/metrics``."""
     global _SERVER, _THREAD, _PORT
     if _SERVER:
         return _PORT or 0
 
     SERVE_DIR.mkdir(parents=True, exist_ok=True)
-    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(SERVE_DIR))
+    handler = functools.partial(_MediaHandler, directory=str(SERVE_DIR))
     _SERVER = socketserver.TCPServer(("127.0.0.1", port), handler)
     _PORT = _SERVER.server_address[1]
     _THREAD = threading.Thread(target=_SERVER.serve_forever, daemon=True)
@@ -58,63 +95,145 @@ def _local_http_url(file_path: str) -> str:
     port = start_http_server()
 
     src = Path(file_path)
-    with src.open("rb") as f:
-        sha = hashlib.sha256(f.read()).hexdigest()
+    with telemetry.span("stage_hash", file=file_path):
+        with src.open("rb") as f:
+            sha = hashlib.sha256(f.read()).hexdigest()
     dest = SERVE_DIR / f"{sha}{src.suffix}"
     if not dest.exists():
-        shutil.copy2(src, dest)
+        with telemetry.span("stage_copy", file=file_path):
+            shutil.copy2(src, dest)
 
     return f"http://127.0.0.1:{port}/{dest.name}"
 
 
-def post_to_instagram(session, video):
-    token = keyring.get_password("ig_scheduler", "long_lived_token")
+def _account(session) -> tuple[str, str]:
+    token = credentials.get_token()
     user_id = session.settings.get("instagram_user_id", "")
     if not token or not user_id:
         raise RuntimeError("Instagram credentials not configured")
-
-    r = requests.post(
-        f"{API}/{user_id}/media",
-        data={
-            "video_url": _local_http_url(video.file_path),
-            "caption": f"{video.title}\n\n{video.description}",
-            "published": "false",
-        },
-        params={"access_token": token},
-        timeout=300,
+    return token, user_id
+
+
+def caption_for(video) -> str:
+    return f"{video.title}\n\n{video.description}"
+
+
+def create_container(session, video) -> str:
+    """Stage ``video`` and create an unpublished container; returns its id."""
+    token, user_id = _account(session)
+    video_url = _local_http_url(video.file_path)
+    with telemetry.span("container_create", file=video.file_path):
+        r = requests.post(
+            f"{API}/{user_id}/media",
+            data={
+                "video_url": video_url,
+                "caption": caption_for(video),
+                "published": "false",
+            },
+            params={"access_token": token},
+            timeout=300,
+        )
+        r.raise_for_status()
+        return r.json()["id"]
+
+
+def container_status(container_id: str) -> str:
+    """Current ``status_code`` of a container (IN_PROGRESS, FINISHED, ...).
+
+    An answer without a status (an ``error`` body) is reported as ``ERROR``.
+    """
+    r = requests.get(
+        f"{API}/{container_id}",
+        params={"fields": "status_code", "access_token": credentials.get_token()},
+        timeout=REQUEST_TIMEOUT,
     )
     r.raise_for_status()
-    container_id = r.json()["id"]
+    body = r.json()
+    if "error" in body or "status_code" not in body:
+        return "ERROR"
+    return body["status_code"]
+
 
+def wait_for_container(container_id: str) -> None:
+    started = time.perf_counter()
     while True:
-        status = requests.get(
-            f"{API}/{container_id}",
-            params={"fields": "status_code", "access_token": token},
-        ).json()["status_code"]
+        status = container_status(container_id)
         if status == "FINISHED":
             break
-        elif status == "ERROR":
-            raise RuntimeError("IG processing failed")
-        time.sleep(10)
-
-    r = requests.post(
-        f"{API}/{user_id}/media_publish",
-        data={"creation_id": container_id},
-        params={"access_token": token},
+        elif status in ("ERROR", "EXPIRED"):
+            telemetry.inc("ig_events", event="container_error")
+            raise RuntimeError(f"IG processing failed ({status})")
+        time.sleep(STATUS_POLL_SECONDS)
+    telemetry.observe_stage(
+        "container_processing", time.perf_counter() - started, container=container_id
     )
-    r.raise_for_status()
-    video.insta_media_id = r.json()["id"]
+
+
+def publish_container(session, video, container_id: str) -> None:
+    token, user_id = _account(session)
+    with telemetry.span("publish", container=container_id):
+        r = requests.post(
+            f"{API}/{user_id}/media_publish",
+            data={"creation_id": container_id},
+            params={"access_token": token},
+            timeout=REQUEST_TIMEOUT,
+        )
+        r.raise_for_status()
+        video.insta_media_id = r.json()["id"]
+    telemetry.inc("ig_events", event="published")
+
+
+def _take_staged(session, video) -> StagedContainer | None:
+    """Claim a usable pre-staged container for ``video`` (see ``backend.staging``)."""
+    if not isinstance(video, Video):
+        return None
+    staged = session.query(StagedContainer).filter_by(video_id=video.id).first()
+    if staged is None:
+        return None
+    session.delete(staged)
+    session.flush()
+    usable = (
+        staged.status in ("IN_PROGRESS", "FINISHED")
+        and staged.caption == caption_for(video)
+        and datetime.utcnow() - staged.created_at < CONTAINER_TTL
+    )
+    return staged if usable else None
+
+
+def post_to_instagram(session, video):
+    """Publish ``video``, using its pre-staged container when there is one."""
+    staged = _take_staged(session, video)
+    if staged is not None:
+        telemetry.inc("ig_events", event="prestaged")
+        container_id = staged.container_id
+        if staged.status != "FINISHED":
+            wait_for_container(container_id)
+    else:
+        container_id = create_container(session, video)
+        wait_for_container(container_id)
+    publish_container(session, video, container_id)
+
+
+def refresh_token(session) -> bool:
+    """Renew the long-lived token if it is close to expiring."""
+    return credentials.CREDENTIALS.refresh_if_needed(getattr(session, "settings", {}), API)
 
 
 def refresh_metrics(session):
-    token = keyring.get_password("ig_scheduler", "long_lived_token")
-    vids = session.query(Video).filter(Video.insta_media_id.isnot(None)).all()
-    for v in vids:
-        r = requests.get(
-            f"{API}/{v.insta_media_id}",
-            params={"fields": "like_count,comments_count,video_view_count", "access_token": token},
-        ).json()
-        v.likes = r.get("like_count", 0)
-        v.comments = r.get("comments_count", 0)
-        v.views = r.get("video_view_count", 0)
-    session.commit()
+    token = credentials.get_token()
+    with telemetry.span("metrics_refresh") as sp:
+        vids = session.query(Video).filter(Video.insta_media_id.isnot(None)).all()
+        samples = []
+        for v in vids:
+            r = requests.get(
+                f"{API}/{v.insta_media_id}",
+                params={"fields": "like_count,comments_count,video_view_count", "access_token": token},
+            ).json()
+            v.likes = r.get("like_count", 0)
+            v.comments = r.get("comments_count", 0)
+            v.views = r.get("video_view_count", 0)
+            samples.append({"video_id": v.id, "likes": v.likes, "comments": v.comments, "views": v.views})
+        timeseries.record_samples(session, samples)
+        session.commit()
+        if sp is not None:
+            sp.fields["media"] = len(vids)
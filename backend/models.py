@@ -1,6 +1,6 @@
 """SQLAlchemy models."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -24,3 +24,36 @@ class Video(Base):
     views = Column(Integer, default=0)
     last_error = Column(String)
     is_active = Column(Boolean, default=True)
+
+
+class MetricSample(Base):
+    """One engagement reading for a posted video (append-only).
+
+    ``ts`` is stored as Unix seconds (UTC) to keep rows small and let
+    analytics load it straight into NumPy arrays.
+    """
+    __tablename__ = "metric_samples"
+    __table_args__ = (Index("ix_metric_samples_video_ts", "video_id", "ts"),)
+
+    id = Column(Integer, primary_key=True)
+    video_id = Column(Integer, ForeignKey("videos.id"), nullable=False)
+    ts = Column(Integer, nullable=False)
+    likes = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+    views = Column(Integer, default=0)
+
+
+class StagedContainer(Base):
+    """An unpublished Instagram media container prepared ahead of a post.
+
+    ``caption`` is the caption the container was created with; if the video's
+    title or description changes afterwards the container is discarded.
+    """
+    __tablename__ = "staged_containers"
+
+    id = Column(Integer, primary_key=True)
+    video_id = Column(Integer, ForeignKey("videos.id"), unique=True, nullable=False)
+    container_id = Column(String, nullable=False)
+    caption = Column(String, default="")
+    status = Column(String, default="IN_PROGRESS")
+    created_at = Column(DateTime, default=datetime.utcnow)
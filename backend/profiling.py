@@ -0,0 +1,237 @@
+"""On-demand cProfile dumps and SQL timings for jobs, ingest and GUI actions.
+
+Profiling is off by default. Functions are marked with :func:`profiled`;
+while disabled the wrapper only checks :data:`ENABLED` and calls through, and
+no SQLAlchemy listeners are attached. While enabled, every outermost profiled
+call writes ``<stamp>-<name>.prof`` (load with ``pstats`` or snakeviz) and,
+if it ran SQL, ``<stamp>-<name>.sql.json`` with per-statement timings. Only
+the newest ``keep`` invocations are kept in the directory.
+
+Toggle with :func:`enable`/:func:`disable`, the ``profiling_enabled``
+setting (re-read when ``settings.json`` changes) or ``SIGUSR1`` on POSIX.
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import itertools
+import json
+import logging
+import os
+import re
+import signal
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+ENABLED = False
+
+DEFAULT_DIR = "profiles"
+DEFAULT_KEEP = 200
+
+LOG = logging.getLogger("ig_scheduler.profiling")
+
+_lock = threading.Lock()
+_local = threading.local()
+_seq = itertools.count(1)
+_directory = Path(DEFAULT_DIR)
+_keep = DEFAULT_KEEP
+_signals = 0  # SIGUSR1 count, bumped by the handler
+_signal_thread: threading.Thread | None = None
+
+
+def enable(directory: str | None = None, keep: int | None = None) -> None:
+    """Start profiling into ``directory`` and attach the SQL listeners."""
+    global ENABLED, _directory, _keep
+    with _lock:
+        _directory = Path(directory or DEFAULT_DIR)
+        _keep = keep or DEFAULT_KEEP
+        if ENABLED:
+            return
+        _directory.mkdir(parents=True, exist_ok=True)
+        event.listen(Engine, "before_cursor_execute", _before_execute)
+        event.listen(Engine, "after_cursor_execute", _after_execute)
+        ENABLED = True
+    LOG.info("profiling enabled, writing to %s", _directory)
+
+
+def disable() -> None:
+    global ENABLED
+    with _lock:
+        if not ENABLED:
+            return
+        ENABLED = False
+        event.remove(Engine, "before_cursor_execute", _before_execute)
+        event.remove(Engine, "after_cursor_execute", _after_execute)
+    LOG.info("profiling disabled")
+
+
+def toggle() -> bool:
+    """Flip profiling on or off; returns the new state."""
+    if ENABLED:
+        disable()
+    else:
+        enable(str(_directory), _keep)
+    return ENABLED
+
+
+def configure(settings: dict) -> None:
+    """Apply ``profiling_enabled``, ``profiling_dir`` and ``profiling_keep``."""
+    if settings.get("profiling_enabled"):
+        enable(settings.get("profiling_dir") or None, settings.get("profiling_keep"))
+    else:
+        disable()
+
+
+# ---------------------------------------------------------------------------
+# Runtime toggles
+# ---------------------------------------------------------------------------
+def install_signal_handler(poll: float = 0.5) -> bool:
+    """Toggle profiling on ``SIGUSR1``; only possible from the main thread.
+
+    The handler only counts the signal; a daemon thread applies the toggle
+    within ``poll`` seconds, so a signal arriving inside :func:`enable` or
+    :func:`disable` cannot deadlock on ``_lock``. Python runs the handler
+    only when the main thread executes bytecode, so a Qt process has to wake
+    it periodically (see ``main.py``).
+    """
+    global _signal_thread
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGUSR1, _on_signal)
+    if _signal_thread is None:
+        _signal_thread = threading.Thread(
+            target=_apply_signals, args=(poll,), name="profiling-signal", daemon=True
+        )
+        _signal_thread.start()
+    return True
+
+
+def _on_signal(signum, frame) -> None:
+    global _signals
+    _signals += 1
+
+
+def _apply_signals(poll: float) -> None:
+    handled = 0
+    while True:
+        time.sleep(poll)
+        received = _signals
+        if (received - handled) % 2:
+            toggle()
+        handled = received
+
+
+def watch_settings(path: str, interval: float = 5.0) -> threading.Event:
+    """Re-apply :func:`configure` whenever ``path`` changes; set the event to stop."""
+    stop = threading.Event()
+
+    def _loop():
+        last = None
+        while not stop.wait(interval):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if mtime == last:
+                    continue
+                with open(path, "r") as f:
+                    settings = json.load(f)
+            except (OSError, ValueError):
+                continue  # missing or half-written; try again
+            if last is not None:
+                configure(settings)
+            last = mtime
+
+    threading.Thread(target=_loop, name="profiling-settings", daemon=True).start()
+    return stop
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+def profiled(name: str):
+    """Decorator: profile each outermost call to the function while enabled."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED or getattr(_local, "active", False):
+                return func(*args, **kwargs)
+            return _run(name, func, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def _run(name: str, func, args, kwargs):
+    profile = cProfile.Profile()
+    _local.active = True
+    _local.sql = []
+    started = time.perf_counter()
+    try:
+        profile.enable()
+    except ValueError:  # another profiler owns this thread
+        profile = None
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if profile is not None:
+            profile.disable()
+        elapsed = time.perf_counter() - started
+        statements = _local.sql
+        _local.active = False
+        _local.sql = None
+        try:
+            _dump(name, profile, statements, elapsed)
+        except OSError:
+            LOG.exception("could not write profile for %s", name)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "sql", None) is not None:
+        conn.info.setdefault("_profiling_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    sql = getattr(_local, "sql", None)
+    starts = conn.info.get("_profiling_start")
+    if sql is not None and starts:
+        sql.append((statement, time.perf_counter() - starts.pop()))
+
+
+def _dump(name: str, profile, statements: list, elapsed: float) -> None:
+    stem = "{}-{:06d}-{}".format(
+        time.strftime("%Y%m%d-%H%M%S"), next(_seq) % 1_000_000, re.sub(r"[^\w-]", "_", name)
+    )
+    directory = _directory
+    directory.mkdir(parents=True, exist_ok=True)
+    if profile is not None:
+        profile.dump_stats(str(directory / f"{stem}.prof"))
+    if statements:
+        totals: dict[str, list] = {}
+        for statement, seconds in statements:
+            entry = totals.setdefault(statement, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+        report = {
+            "name": name,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "sql_ms": round(sum(s for _, s in statements) * 1000, 3),
+            "statements": [
+                {"sql": sql, "count": n, "total_ms": round(total * 1000, 3), "max_ms": round(peak * 1000, 3)}
+                for sql, (n, total, peak) in sorted(totals.items(), key=lambda kv: -kv[1][1])
+            ],
+        }
+        (directory / f"{stem}.sql.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    _rotate(directory)
+
+
+def _rotate(directory: Path) -> None:
+    stems = sorted({p.name.split(".", 1)[0] for p in directory.iterdir() if p.suffix in (".prof", ".json")})
+    for stem in stems[:max(0, len(stems) - _keep)]:
+        for suffix in (".prof", ".sql.json"):
+            try:
+                (directory / f"{stem}{suffix}").unlink()
+            except FileNotFoundError:
+                pass
@@ -1,56 +1,262 @@
-"""Background scheduler configuration."""
-from datetime import datetime, date
+"""Background scheduler configuration.
+
+Jobs are stored by id in an APScheduler job store; with ``persist_jobs`` the
+store is a table in the app database, so next-run times survive restarts. A
+job store pickles its jobs, so the jobs are small module-level functions that
+look up the engine and settings in :data:`_CONTEXT` rather than taking them
+as arguments. Each run opens its own short-lived session.
+"""
+import contextlib
+import json
+import os
+import threading
+from datetime import datetime, date, timedelta, timezone
+from typing import Collection, Iterator
+
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, update
 
+from . import profiling, staging, telemetry, timeseries
 from .models import Video
-from .instagram import post_to_instagram, refresh_metrics
+from .instagram import post_to_instagram, refresh_metrics, refresh_token
+
+# Defaults for the scheduler settings in ``settings.json``.
+MISFIRE_GRACE_SECONDS = 300
+CATCH_UP_MINUTES = 60
+
+# Session, scheduler and fallbacks used by the job functions below.
+_CONTEXT: dict = {}
+# Held while posting and while pre-staging writes ``staged_containers`` rows.
+_POST_LOCK = threading.Lock()
+
+
+def daily_allowance(session: Session, max_posts_per_day: int) -> int:
+    """How many more posts ``max_posts_per_day`` allows today."""
+    todays_count = (
+        session.query(Video)
+        .filter(func.date(Video.posted_at) == date.today())
+        .count()
+    )
+    return max(max_posts_per_day - todays_count, 0)
 
 
 def post_due_videos(session: Session, max_posts_per_day: int):
     now = datetime.utcnow()
     videos = (
         session.query(Video)
-        .filter(Video.scheduled_at <= now, Video.posted_at.is_(None))
+        .filter(Video.scheduled_at <= now, Video.posted_at.is_(None), Video.is_active.is_(True))
         .order_by(Video.scheduled_at)
         .all()
     )
 
-    todays_count = (
-        session.query(Video)
-        .filter(func.date(Video.posted_at) == date.today())
-        .count()
-    )
-    allowance = max_posts_per_day - todays_count
+    allowance = daily_allowance(session, max_posts_per_day)
+    telemetry.set_gauge("ig_queue_depth", len(videos))
     for vid in videos[:allowance]:
         try:
-            post_to_instagram(session, vid)
+            with telemetry.span("post", video=vid.id):
+                post_to_instagram(session, vid)
             vid.posted_at = datetime.utcnow()
             session.commit()
         except Exception as exc:  # pragma: no cover - network errors
             vid.last_error = str(exc)
             session.commit()
+            telemetry.inc("ig_events", event="post_failed")
+            telemetry.log_event("post_failed", video=vid.id, error=str(exc))
+
+
+def spread_overdue(
+    session: Session,
+    window: timedelta,
+    grace: timedelta,
+    now: datetime | None = None,
+    limit: int | None = None,
+    skip: Collection[int] = (),
+) -> list[int]:
+    """Re-time posts missed by more than ``grace`` evenly over ``window``.
+
+    After an outage every missed post is due at once; spreading them keeps
+    the catch-up from bursting into the API rate limits. Order is kept. Only
+    the first ``limit`` posts (today's remaining allowance) are moved, and
+    ids in ``skip`` (already spread once) are left alone, so posts held back
+    by the quota or that keep failing keep their original times.
+    Returns the ids moved.
+    """
+    now = now or datetime.utcnow()
+    overdue = [
+        vid for (vid,) in session.query(Video.id)
+        .filter(
+            Video.scheduled_at < now - grace,
+            Video.posted_at.is_(None),
+            Video.is_active.is_(True),
+        )
+        .order_by(Video.scheduled_at, Video.id)
+        if vid not in skip
+    ][:limit]
+    if len(overdue) < 2:
+        return []
+    step = window / len(overdue)
+    session.execute(
+        update(Video),
+        [{"id": vid, "scheduled_at": now + i * step} for i, vid in enumerate(overdue)],
+    )
+    session.commit()
+    telemetry.log_event("catch_up", videos=len(overdue), window=window.total_seconds())
+    return overdue
+
+
+# ---------------------------------------------------------------------------
+# Job functions
+# ---------------------------------------------------------------------------
+def _settings() -> dict:
+    """The app settings, refreshed from ``settings_path`` whenever the file changed.
+
+    The dict is updated in place, so every holder of ``session.settings``
+    (the GUI session too, in-process) sees the new values.
+    """
+    settings = getattr(_CONTEXT["session"], "settings", None)
+    if settings is None:
+        return {}
+    path = _CONTEXT.get("settings_path")
+    if path:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if mtime != _CONTEXT.get("settings_mtime"):
+                with open(path, "r") as f:
+                    settings.update(json.load(f))
+                _CONTEXT["settings_mtime"] = mtime
+        except (OSError, ValueError):
+            pass  # missing or half-written; keep the last good values
+    return settings
+
+
+@contextlib.contextmanager
+def _job_session() -> Iterator[Session]:
+    """A short-lived session per job run; jobs run on the scheduler's threads."""
+    session = Session(bind=_CONTEXT["session"].get_bind())
+    session.settings = _settings()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@profiling.profiled("job.post_due_videos")
+def run_post_due() -> None:
+    settings = _settings()
+    minutes = settings.get("catch_up_minutes", CATCH_UP_MINUTES)
+    # _settings() re-reads settings.json, so a changed limit applies without a restart.
+    max_posts = settings.get("max_posts_per_day", _CONTEXT["max_posts_per_day"])
+    with _POST_LOCK, _job_session() as session:
+        allowance = daily_allowance(session, max_posts)
+        if minutes and allowance > 0:
+            spread = _CONTEXT.setdefault("spread", set())
+            spread.update(spread_overdue(
+                session,
+                timedelta(minutes=minutes),
+                timedelta(seconds=settings.get("misfire_grace_seconds", MISFIRE_GRACE_SECONDS)),
+                limit=allowance,
+                skip=spread,
+            ))
+        post_due_videos(session, max_posts)
+
+
+@profiling.profiled("job.stage_upcoming")
+def run_stage_upcoming() -> None:
+    minutes = _settings().get("prestage_minutes", staging.PRESTAGE_MINUTES)
+    if not minutes:
+        return
+    # The lock is only taken around row writes; uploads and status checks
+    # run unlocked so a post falling due meanwhile is never held up.
+    with _job_session() as session:
+        times = staging.stage_upcoming(session, timedelta(minutes=minutes), lock=_POST_LOCK)
+    # The minutely post job can be up to a minute late; a one-off run at the
+    # exact scheduled time publishes the staged container on the second.
+    for at in times:
+        _CONTEXT["scheduler"].add_job(
+            run_post_due,
+            "date",
+            run_date=at.replace(tzinfo=timezone.utc),
+            id=f"publish_at_{int(at.replace(tzinfo=timezone.utc).timestamp())}",
+            replace_existing=True,
+        )
+
+
+@profiling.profiled("job.refresh_metrics")
+def run_refresh_metrics() -> None:
+    with _job_session() as session:
+        refresh_metrics(session)
+
+
+@profiling.profiled("job.downsample_metrics")
+def run_downsample() -> None:
+    with _job_session() as session:
+        timeseries.downsample(session)
+
+
+@profiling.profiled("job.refresh_token")
+def run_refresh_token() -> None:
+    with _job_session() as session:
+        refresh_token(session)
 
 
 def create_scheduler(
     session: Session,
     max_posts_per_day: int,
     metrics_refresh_minutes: int = 30,
+    settings_path: str | None = None,
 ) -> BackgroundScheduler:
-    """Create and start the background scheduler."""
-    scheduler = BackgroundScheduler(daemon=True)
-    scheduler.add_job(
-        post_due_videos,
-        "interval",
-        minutes=1,
-        args=[session, max_posts_per_day],
+    """Create and start the background scheduler.
+
+    Jobs already in a persistent store keep their next-run time; a job whose
+    run was missed while the app was closed fires once on start if it is
+    within ``misfire_grace_seconds``, otherwise it waits for its next run.
+    With ``settings_path``, job runs pick up edits to that file.
+    """
+    settings = getattr(session, "settings", None) or {}
+    grace = settings.get("misfire_grace_seconds", MISFIRE_GRACE_SECONDS)
+    _CONTEXT.update(
+        session=session,
+        max_posts_per_day=max_posts_per_day,
+        spread=set(),
+        settings_path=settings_path,
+        settings_mtime=None,
     )
-    scheduler.add_job(
-        refresh_metrics,
-        "interval",
-        minutes=metrics_refresh_minutes,
-        args=[session],
+
+    if settings.get("persist_jobs"):
+        store = SQLAlchemyJobStore(engine=session.get_bind())
+    else:
+        store = MemoryJobStore()
+    scheduler = BackgroundScheduler(
+        daemon=True,
+        jobstores={"default": store},
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": grace,
+        },
     )
-    scheduler.start()
+    _CONTEXT["scheduler"] = scheduler
+    # Start paused so stored jobs can be reconciled before anything fires.
+    scheduler.start(paused=True)
+    jobs = [
+        ("post_due_videos", run_post_due, timedelta(minutes=1), None),
+        ("stage_upcoming", run_stage_upcoming, timedelta(minutes=1), None),
+        ("refresh_metrics", run_refresh_metrics, timedelta(minutes=metrics_refresh_minutes), None),
+        ("downsample_metrics", run_downsample, timedelta(hours=24), None),
+        ("refresh_token", run_refresh_token, timedelta(hours=6), datetime.now()),
+    ]
+    for job_id, func_, interval, first_run in jobs:
+        existing = scheduler.get_job(job_id)
+        if existing is None:
+            extra = {"next_run_time": first_run} if first_run else {}
+            scheduler.add_job(func_, "interval", seconds=interval.total_seconds(), id=job_id, **extra)
+            continue
+        if existing.misfire_grace_time != grace:
+            scheduler.modify_job(job_id, misfire_grace_time=grace)
+        if existing.trigger.interval != interval:
+            scheduler.reschedule_job(job_id, trigger="interval", seconds=interval.total_seconds())
+    scheduler.resume()
     return scheduler
@@ -0,0 +1,235 @@
+"""Backend start-up and the optional out-of-process worker.
+
+:func:`start_backend` brings up the watcher, scheduler and media server in
+the current process. :func:`run_worker` does the same in a child process
+and then serves bulk commands from the GUI over a ``multiprocessing`` pipe,
+sending progress, results and "videos changed" notifications back.
+
+Messages are plain dicts. GUI to worker::
+
+    {"cmd": "bulk", "job": 1, "action": "delete", "ids": [...], "options": {...}}
+    {"cmd": "ping"} | {"cmd": "shutdown"}
+
+Worker to GUI::
+
+    {"event": "ready" | "pong" | "changed"}
+    {"event": "progress", "job": 1, "action": "delete", "done": 3, "total": 9}
+    {"event": "finished", "job": 1, "result": BulkResult}
+    {"event": "failed", "job": 1, "action": "delete", "message": "..."}
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from . import bulk, db, models, profiling, scheduler, telemetry, watcher
+from .instagram import set_api_base, start_http_server, stop_http_server
+
+# Minimum seconds between "changed" notifications sent to the GUI.
+CHANGE_DEBOUNCE_SECONDS = 0.5
+# ``Session.info`` flag: the session wrote rows since its last commit.
+_WROTE = "worker_wrote"
+
+
+def load_settings(path: str = "settings.json") -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def update_settings(path: str, **changes) -> dict:
+    """Write ``changes`` into the settings file, keeping keys edited elsewhere."""
+    settings = load_settings(path)
+    settings.update(changes)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(settings, f, indent=4)
+        f.write("\n")
+    os.replace(tmp, path)  # readers never see a half-written file
+    return settings
+
+
+@dataclass
+class Backend:
+    """Handles to everything :func:`start_backend` started."""
+
+    session: Any
+    scheduler: Any
+    observer: Any
+    settings_watch: Any = None
+
+    def stop(self) -> None:
+        if self.settings_watch:
+            self.settings_watch.set()
+        if self.scheduler:
+            self.scheduler.shutdown(wait=False)
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+        stop_http_server()
+
+
+def start_profiling(settings: dict, settings_path: str | None = None):
+    """Apply the profiling settings and set up the runtime toggles."""
+    profiling.configure(settings)
+    profiling.install_signal_handler()
+    return profiling.watch_settings(settings_path) if settings_path else None
+
+
+def start_backend(settings: dict, settings_path: str | None = None) -> Backend:
+    """Create the DB, then start telemetry, watchers and the scheduler."""
+    models.Base.metadata.create_all(db.ENGINE)
+    session = next(db.get_session())
+    session.settings = settings
+    settings_watch = start_profiling(settings, settings_path)
+    # e.g. the local simulator (``python -m benchmarks.graph_sim``)
+    set_api_base(settings.get("graph_api_base") or None)
+
+    if settings.get("telemetry_enabled"):
+        telemetry.enable(settings.get("telemetry_log") or None)
+        start_http_server(settings.get("http_port", 0))
+
+    roots = watcher.roots_from_settings(settings)
+    observer = watcher.start_watchers(roots, db.SessionLocal) if roots else None
+
+    sched = scheduler.create_scheduler(
+        session,
+        settings.get("max_posts_per_day", 25),
+        settings.get("metrics_refresh_minutes", 30),
+        settings_path=settings_path,
+    )
+    return Backend(session, sched, observer, settings_watch)
+
+
+class WorkerService:
+    """Serve GUI commands on ``conn`` until it closes or says ``shutdown``."""
+
+    def __init__(self, conn, settings: dict, session_factory=None):
+        self.conn = conn
+        self.settings = settings
+        self.session_factory = session_factory or sessionmaker(bind=db.ENGINE)
+        self._send_lock = threading.Lock()
+        self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk")
+        self._changed = threading.Event()
+        self._closed = threading.Event()
+
+    def send(self, message: dict) -> None:
+        with self._send_lock:
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError, BrokenPipeError):
+                self._closed.set()
+
+    # Change notifications ----------------------------------------------
+    # Only commits that wrote something count; idle jobs commit too, and
+    # every "changed" makes the GUI reload its list.
+    def _on_flush(self, session, flush_context) -> None:
+        if session.new or session.deleted or any(session.is_modified(o) for o in session.dirty):
+            session.info[_WROTE] = True
+
+    def _on_execute(self, state) -> None:
+        if state.is_insert or state.is_update or state.is_delete:
+            state.session.info[_WROTE] = True
+
+    def _on_rollback(self, session) -> None:
+        session.info.pop(_WROTE, None)
+
+    def _on_commit(self, session) -> None:
+        if session.info.pop(_WROTE, False):
+            self._changed.set()
+
+    def _notify_loop(self) -> None:
+        while not self._closed.is_set():
+            if self._changed.wait(0.5) and not self._closed.is_set():
+                self._changed.clear()
+                self.send({"event": "changed"})
+                self._closed.wait(CHANGE_DEBOUNCE_SECONDS)
+
+    # Commands ----------------------------------------------------------
+    def _run_bulk(self, job: int, action: str, ids: list[int], options: dict) -> None:
+        session = self.session_factory()
+        session.settings = dict(self.settings)
+        try:
+            result = bulk.ACTIONS[action](
+                session,
+                ids,
+                progress=lambda done, total: self.send(
+                    {"event": "progress", "job": job, "action": action, "done": done, "total": total}
+                ),
+                **options,
+            )
+        except Exception as exc:
+            session.rollback()
+            self.send({"event": "failed", "job": job, "action": action, "message": str(exc)})
+        else:
+            self.send({"event": "finished", "job": job, "result": result})
+        finally:
+            session.close()
+
+    def handle(self, message: dict) -> bool:
+        """Process one command; returns False when the worker should stop."""
+        cmd = message.get("cmd")
+        if cmd == "shutdown":
+            return False
+        if cmd == "ping":
+            self.send({"event": "pong"})
+        elif cmd == "bulk":
+            if message.get("action") not in bulk.ACTIONS:
+                self.send({"event": "failed", "job": message.get("job"), "action": message.get("action"),
+                           "message": f"Unknown action {message.get('action')!r}"})
+            else:
+                self._jobs.submit(
+                    self._run_bulk,
+                    message.get("job"),
+                    message["action"],
+                    list(message.get("ids", [])),
+                    dict(message.get("options", {})),
+                )
+        return True
+
+    def serve(self) -> None:
+        for name, fn in self._listeners():
+            event.listen(Session, name, fn)
+        notifier = threading.Thread(target=self._notify_loop, daemon=True)
+        notifier.start()
+        self.send({"event": "ready"})
+        try:
+            while not self._closed.is_set():
+                try:
+                    message = self.conn.recv()
+                except (EOFError, OSError):
+                    break  # GUI went away
+                if not self.handle(message):
+                    break
+        finally:
+            self._closed.set()
+            self._jobs.shutdown(wait=True)
+            for name, fn in self._listeners():
+                event.remove(Session, name, fn)
+
+    def _listeners(self):
+        return [
+            ("after_flush", self._on_flush),
+            ("do_orm_execute", self._on_execute),
+            ("after_rollback", self._on_rollback),
+            ("after_commit", self._on_commit),
+        ]
+
+
+def run_worker(conn, settings_path: str = "settings.json") -> None:
+    """``multiprocessing`` entry point for the backend worker process."""
+    # If this process was forked, never reuse the parent's pooled SQLite connections.
+    db.ENGINE.dispose(close=False)
+    settings = load_settings(settings_path)
+    backend = start_backend(settings, settings_path)
+    try:
+        WorkerService(conn, settings).serve()
+    finally:
+        backend.stop()
+        conn.close()
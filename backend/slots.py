@@ -0,0 +1,150 @@
+"""Assign videos to future posting slots from the daily schedule template."""
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Iterable, Iterator, Sequence
+
+import pytz
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from .models import Video
+from .timezones import resolve_timezone, utc_to_local
+
+
+def _to_utc(day: date, t: time, tz: tzinfo) -> datetime:
+    """Naive UTC datetime for local wall time ``t`` on ``day`` in ``tz``."""
+    local = datetime.combine(day, t)
+    if hasattr(tz, "localize"):
+        local = tz.localize(local)
+    else:
+        local = local.replace(tzinfo=tz)
+    return local.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def iter_slots(template: Sequence[time], tz: tzinfo, start: datetime) -> Iterator[tuple[datetime, date]]:
+    """Yield ``(utc_slot, local_day)`` in time order, strictly after ``start``.
+
+    Each template time is an infinite daily stream; a heap merges them, so
+    ordering stays correct even when DST shifts move slots across each other.
+    """
+    first_day = utc_to_local(start, tz).date()
+    heap = [(_to_utc(first_day, t, tz), i, first_day) for i, t in enumerate(template)]
+    heapq.heapify(heap)
+    while heap:
+        slot, i, day = heap[0]
+        if slot > start:
+            yield slot, day
+        next_day = day + timedelta(days=1)
+        heapq.heapreplace(heap, (_to_utc(next_day, template[i], tz), i, next_day))
+
+
+def allocate_slots(
+    count: int,
+    template: Sequence[time],
+    tz: tzinfo,
+    max_posts_per_day: int,
+    occupied: Iterable[datetime] = (),
+    now: datetime | None = None,
+) -> list[datetime]:
+    """Return ``count`` free naive-UTC slots in ascending order.
+
+    ``occupied`` holds UTC times already taken (scheduled or posted); they
+    block their exact slot and count towards their local day's quota.
+    """
+    if count <= 0:
+        return []
+    template = sorted(set(template))
+    if not template or max_posts_per_day <= 0:
+        raise ValueError("Schedule template is empty or max_posts_per_day is 0")
+
+    now = now or datetime.utcnow()
+    taken = set()
+    per_day: Counter = Counter()
+    for dt in occupied:
+        taken.add(dt)
+        per_day[utc_to_local(dt, tz).date()] += 1
+
+    result: list[datetime] = []
+    for slot, day in iter_slots(template, tz, now):
+        if slot in taken or per_day[day] >= max_posts_per_day:
+            continue
+        result.append(slot)
+        per_day[day] += 1
+        if len(result) == count:
+            break
+    return result
+
+
+def schedule_videos(
+    session: Session,
+    video_ids: Sequence[int],
+    template: Sequence[time],
+    settings: dict,
+    now: datetime | None = None,
+) -> dict[int, datetime]:
+    """Give each of ``video_ids`` (in order) the next free slot; one bulk update.
+
+    Posted and deleted videos among them are left alone and get no slot.
+    """
+    eligible = {
+        vid for (vid,) in session.query(Video.id).filter(
+            Video.id.in_(list(video_ids)),
+            Video.posted_at.is_(None),
+            Video.is_active.is_(True),
+        )
+    }
+    ids = [vid for vid in video_ids if vid in eligible]
+    if not ids:
+        return {}
+    now = now or datetime.utcnow()
+    tz = resolve_timezone(settings.get("timezone"))
+    day_start = _to_utc(utc_to_local(now, tz).date(), time(0), tz)
+
+    occupied = [
+        dt for (dt,) in session.query(Video.scheduled_at).filter(
+            Video.scheduled_at >= day_start,
+            Video.posted_at.is_(None),
+            Video.is_active.is_(True),
+            Video.id.notin_(ids),
+        )
+    ]
+    occupied += [
+        dt for (dt,) in session.query(Video.posted_at).filter(Video.posted_at >= day_start)
+    ]
+
+    slots = allocate_slots(
+        len(ids), template, tz, settings.get("max_posts_per_day", 25), occupied, now
+    )
+    assignment = dict(zip(ids, slots))
+    session.execute(
+        update(Video),
+        [{"id": vid, "scheduled_at": slot} for vid, slot in assignment.items()],
+    )
+    session.commit()
+    return assignment
+
+
+def unscheduled_backlog(session: Session) -> list[int]:
+    """IDs of active, unposted, unscheduled videos, oldest first."""
+    return [
+        vid for (vid,) in session.query(Video.id)
+        .filter(
+            Video.is_active.is_(True),
+            Video.scheduled_at.is_(None),
+            Video.posted_at.is_(None),
+        )
+        .order_by(Video.created_at, Video.id)
+    ]
+
+
+def schedule_backlog(
+    session: Session,
+    template: Sequence[time],
+    settings: dict,
+    now: datetime | None = None,
+) -> dict[int, datetime]:
+    """Schedule every unscheduled video in one pass."""
+    return schedule_videos(session, unscheduled_backlog(session), template, settings, now)
@@ -0,0 +1,161 @@
+"""Prepare Instagram containers ahead of their scheduled posts.
+
+Creating a container (staging the file, Instagram fetching and transcoding
+it) takes minutes, while publishing a ready container is one call. The
+lookahead job creates containers for posts due within ``prestage_minutes``
+and keeps them in ``staged_containers``; ``post_to_instagram`` then only has
+to publish. Containers Instagram may have discarded, or whose caption no
+longer matches the video, are dropped and prepared again.
+"""
+from __future__ import annotations
+
+import contextlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import requests
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from . import instagram, telemetry
+from .models import StagedContainer, Video
+
+PRESTAGE_MINUTES = 30
+# Stop relying on a container this long before Instagram's 24 h expiry.
+EXPIRY_MARGIN = timedelta(hours=1)
+
+_NO_LOCK = contextlib.nullcontext()
+
+
+def _check_statuses(session: Session, now: datetime) -> tuple[list[int], dict[int, str]]:
+    """Decide which rows are stale and poll Instagram for unfinished ones.
+
+    Network calls happen here, outside any lock. Returns ``(drop, status)``
+    keyed by ``StagedContainer.id``.
+    """
+    max_age = instagram.CONTAINER_TTL - EXPIRY_MARGIN
+    drop: list[int] = []
+    pending: list[tuple[int, str]] = []
+    rows = (
+        session.query(StagedContainer, Video)
+        .outerjoin(Video, Video.id == StagedContainer.video_id)
+        .all()
+    )
+    for staged, video in rows:
+        stale = (
+            video is None
+            or video.posted_at is not None
+            or video.scheduled_at is None
+            or not video.is_active
+            or staged.caption != instagram.caption_for(video)
+            or now - staged.created_at >= max_age
+        )
+        if stale:
+            drop.append(staged.id)
+        elif staged.status == "IN_PROGRESS":
+            pending.append((staged.id, staged.container_id))
+    session.rollback()  # no read transaction stays open during the API calls
+
+    status: dict[int, str] = {}
+    for row_id, container_id in pending:
+        try:
+            new = instagram.container_status(container_id)
+        except requests.HTTPError:
+            new = "ERROR"  # Instagram rejected the id (unknown/expired)
+        except requests.RequestException:
+            continue  # network trouble; try again next pass
+        if new not in ("IN_PROGRESS", "FINISHED"):
+            drop.append(row_id)
+        elif new != "IN_PROGRESS":
+            status[row_id] = new
+    return drop, status
+
+
+def _apply_statuses(session: Session, drop: list[int], status: dict[int, str]) -> None:
+    if not drop and not status:
+        return  # idle pass; no empty commit
+    if drop:
+        session.execute(delete(StagedContainer).where(StagedContainer.id.in_(drop)))
+    for row_id, value in status.items():
+        # Rows claimed by a post meanwhile are simply no longer there.
+        session.execute(update(StagedContainer).where(StagedContainer.id == row_id).values(status=value))
+    session.commit()
+    if drop:
+        telemetry.inc("ig_events", len(drop), event="prestage_dropped")
+
+
+def refresh_staged(session: Session, now: datetime | None = None, lock=_NO_LOCK) -> int:
+    """Update container statuses and drop stale ones; returns rows dropped.
+
+    ``lock`` is held only while rows are written, never during API calls.
+    """
+    drop, status = _check_statuses(session, now or datetime.utcnow())
+    with lock:
+        _apply_statuses(session, drop, status)
+    return len(drop)
+
+
+def stage_upcoming(
+    session: Session,
+    lookahead: timedelta = timedelta(minutes=PRESTAGE_MINUTES),
+    now: datetime | None = None,
+    lock=_NO_LOCK,
+) -> list[datetime]:
+    """Create containers for posts due within ``lookahead``.
+
+    ``lock`` (shared with posting) is held only while ``staged_containers``
+    rows are written, so a slow upload here never delays a due post.
+    Returns the distinct future ``scheduled_at`` times that have a staged
+    container, so the caller can publish exactly on time.
+    """
+    now = now or datetime.utcnow()
+    lookahead = min(lookahead, instagram.CONTAINER_TTL - EXPIRY_MARGIN)
+    refresh_staged(session, now, lock)
+
+    upcoming = [
+        SimpleNamespace(
+            id=v.id, file_path=v.file_path, title=v.title, description=v.description
+        )
+        for v in session.query(Video)
+        .outerjoin(StagedContainer, StagedContainer.video_id == Video.id)
+        .filter(
+            StagedContainer.id.is_(None),
+            Video.scheduled_at > now,
+            Video.scheduled_at <= now + lookahead,
+            Video.posted_at.is_(None),
+            Video.is_active.is_(True),
+        )
+        .order_by(Video.scheduled_at)
+    ]
+    session.rollback()  # no read transaction stays open during uploads
+    for video in upcoming:
+        try:
+            with telemetry.span("prestage", video=video.id):
+                container_id = instagram.create_container(session, video)
+        except Exception as exc:
+            # Posting falls back to the full upload at the scheduled time.
+            telemetry.inc("ig_events", event="prestage_failed")
+            telemetry.log_event("prestage_failed", video=video.id, error=str(exc))
+            continue
+        with lock:
+            # A post may have gone out (or claimed a row) during the upload.
+            still_due = session.query(Video.id).filter(
+                Video.id == video.id, Video.posted_at.is_(None)
+            ).first()
+            claimed = session.query(StagedContainer.id).filter_by(video_id=video.id).first()
+            if still_due and not claimed:
+                session.add(StagedContainer(
+                    video_id=video.id,
+                    container_id=container_id,
+                    caption=instagram.caption_for(video),
+                    created_at=datetime.utcnow(),
+                ))
+            session.commit()
+
+    return [
+        at for (at,) in session.query(Video.scheduled_at)
+        .join(StagedContainer, StagedContainer.video_id == Video.id)
+        .filter(Video.scheduled_at > now)
+        .distinct()
+        .order_by(Video.scheduled_at)
+    ]
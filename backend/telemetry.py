@@ -0,0 +1,190 @@
+"""Stage timings and counters exposed as OpenMetrics and a JSON log.
+
+Telemetry is off by default. While disabled, :func:`span` returns a shared
+no-op context manager and the recording helpers return after one flag check,
+so instrumented code pays next to nothing.
+"""
+from __future__ import annotations
+
+import bisect
+import contextlib
+import json
+import logging
+import threading
+import time
+
+ENABLED = False
+
+LOG = logging.getLogger("ig_scheduler.telemetry")
+
+# Histogram bucket upper bounds in seconds (hashing ms … container processing minutes).
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+_HELP = {
+    "ig_stage_duration_seconds": "Time spent in each pipeline stage.",
+    "ig_events": "Pipeline events by kind.",
+    "ig_queue_depth": "Videos due for posting at the last scheduler run.",
+}
+
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple], float] = {}
+_gauges: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], list] = {}  # [bucket counts..., sum, count]
+_NOOP = contextlib.nullcontext()
+_log_handler: logging.Handler | None = None
+
+
+def enable(log_path: str | None = None) -> None:
+    """Start recording; optionally append JSON lines to ``log_path``."""
+    global ENABLED, _log_handler
+    ENABLED = True
+    if log_path and _log_handler is None:
+        _log_handler = logging.FileHandler(log_path, encoding="utf-8")
+        _log_handler.setFormatter(logging.Formatter("%(message)s"))
+        LOG.addHandler(_log_handler)
+        LOG.setLevel(logging.INFO)
+
+
+def disable() -> None:
+    global ENABLED, _log_handler
+    ENABLED = False
+    if _log_handler is not None:
+        LOG.removeHandler(_log_handler)
+        _log_handler.close()
+        _log_handler = None
+
+
+def reset() -> None:
+    """Drop all recorded values."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[(name, _labels(labels))] = value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0, 0]
+        hist[bisect.bisect_left(BUCKETS, value)] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+
+def log_event(event: str, **fields) -> None:
+    """Write one structured JSON record to the telemetry log."""
+    if not ENABLED:
+        return
+    fields["event"] = event
+    fields["ts"] = time.time()
+    LOG.info(json.dumps(fields, default=str, sort_keys=True))
+
+
+def observe_stage(stage: str, seconds: float, **fields) -> None:
+    """Record an already-measured stage duration."""
+    if not ENABLED:
+        return
+    observe("ig_stage_duration_seconds", seconds, stage=stage)
+    log_event("span", stage=stage, duration=seconds, **fields)
+
+
+class _Span:
+    __slots__ = ("stage", "fields", "start")
+
+    def __init__(self, stage: str, fields: dict):
+        self.stage = stage
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        observe_stage(self.stage, elapsed, **self.fields)
+        return False
+
+
+def span(stage: str, **fields):
+    """Time the enclosed block as ``stage``; extra ``fields`` go to the JSON log."""
+    if not ENABLED:
+        return _NOOP
+    return _Span(stage, fields)
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render_openmetrics() -> str:
+    """Return all metrics in the OpenMetrics text format."""
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted((k, list(v)) for k, v in _histograms.items())
+
+    lines: list[str] = []
+    seen: set[str] = set()
+
+    def header(name: str, kind: str) -> None:
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+            if name in _HELP:
+                lines.append(f"# HELP {name} {_HELP[name]}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}_total{_fmt_labels(labels)} {value}")
+    for (name, labels), value in gauges:
+        header(name, "gauge")
+        lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    for (name, labels), hist in histograms:
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), hist):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', le),))} {cumulative}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {hist[-1]}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {hist[-2]}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
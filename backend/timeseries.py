@@ -0,0 +1,95 @@
+"""Append-only store for engagement samples collected by ``refresh_metrics``."""
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from .models import MetricSample
+
+# (age, bucket) tiers: samples older than ``age`` keep one point per ``bucket``.
+DEFAULT_RETENTION: Sequence[tuple[timedelta, timedelta]] = (
+    (timedelta(days=2), timedelta(hours=1)),
+    (timedelta(days=30), timedelta(days=1)),
+)
+
+COLUMNS = ("video_id", "ts", "likes", "comments", "views")
+
+
+def record_samples(session: Session, rows: Iterable[dict], ts: int | None = None) -> int:
+    """Append one sample per row (``video_id``, ``likes``, ``comments``, ``views``).
+
+    The caller commits; returns the number of rows written.
+    """
+    ts = int(time.time()) if ts is None else ts
+    batch = [{**row, "ts": ts} for row in rows]
+    if batch:
+        session.execute(insert(MetricSample), batch)
+    return len(batch)
+
+
+def downsample(
+    session: Session,
+    retention: Sequence[tuple[timedelta, timedelta]] = DEFAULT_RETENTION,
+    now: int | None = None,
+) -> int:
+    """Thin old samples to the newest point per bucket; returns rows deleted."""
+    now = int(time.time()) if now is None else now
+    deleted = 0
+    for age, bucket in retention:
+        result = session.execute(
+            text(
+                "DELETE FROM metric_samples WHERE ts < :cutoff AND id NOT IN ("
+                " SELECT MAX(id) FROM metric_samples WHERE ts < :cutoff"
+                " GROUP BY video_id, ts / :bucket)"
+            ),
+            {"cutoff": now - int(age.total_seconds()), "bucket": int(bucket.total_seconds())},
+        )
+        deleted += result.rowcount or 0
+    session.commit()
+    return deleted
+
+
+def load_arrays(
+    session: Session,
+    since: int | None = None,
+    video_ids: Sequence[int] | None = None,
+    window: int | None = None,
+) -> dict[str, np.ndarray]:
+    """Return samples as int64 column arrays sorted by ``(video_id, ts)``.
+
+    With ``window`` only samples taken within that many seconds of each
+    video's ``posted_at`` are read, which keeps long histories cheap: the
+    ``(video_id, ts)`` index turns it into one short range scan per post.
+    """
+    sql = "SELECT m.video_id, m.ts, m.likes, m.comments, m.views FROM metric_samples m"
+    clauses, params = [], {}
+    if window is not None:
+        # CROSS JOIN pins videos as the outer loop so SQLite probes the index
+        # per post instead of scanning every sample.
+        sql = (
+            "SELECT m.video_id, m.ts, m.likes, m.comments, m.views"
+            " FROM videos v CROSS JOIN metric_samples m ON m.video_id = v.id"
+            " AND m.ts <= CAST(strftime('%s', v.posted_at) AS INTEGER) + :window"
+        )
+        clauses.append("v.posted_at IS NOT NULL")
+        params["window"] = int(window)
+    if since is not None:
+        clauses.append("m.ts >= :since")
+        params["since"] = since
+    if video_ids is not None:
+        if not video_ids:
+            return {name: np.empty(0, dtype=np.int64) for name in COLUMNS}
+        clauses.append(f"m.video_id IN ({','.join(str(int(v)) for v in video_ids)})")
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY m.video_id, m.ts"
+    rows = session.execute(text(sql), params).fetchall()
+    flat = np.fromiter(
+        (v or 0 for row in rows for v in row), dtype=np.int64, count=len(rows) * len(COLUMNS)
+    ).reshape(-1, len(COLUMNS))
+    return {name: flat[:, i] for i, name in enumerate(COLUMNS)}
@@ -0,0 +1,95 @@
+"""Resolve the posting time zone from settings."""
+from __future__ import annotations
+
+import functools
+import os
+import time
+from datetime import datetime, timedelta, timezone, tzinfo
+
+import numpy as np
+import pytz
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class LocalTimezone(tzinfo):
+    """The OS local zone via ``time.localtime``, DST rules included.
+
+    Used when the local zone has no IANA name we can find (e.g. on Windows);
+    ``datetime.now().astimezone().tzinfo`` would freeze today's offset.
+    """
+
+    def fromutc(self, dt: datetime) -> datetime:
+        stamp = (dt.replace(tzinfo=None) - _EPOCH) // timedelta(seconds=1)
+        return dt + timedelta(seconds=time.localtime(stamp).tm_gmtoff)
+
+    def utcoffset(self, dt: datetime | None) -> timedelta:
+        if dt is None:
+            return timedelta(seconds=time.localtime().tm_gmtoff)
+        stamp = time.mktime(dt.replace(tzinfo=None).timetuple()[:8] + (-1,))
+        return timedelta(seconds=time.localtime(stamp).tm_gmtoff)
+
+    def dst(self, dt: datetime | None) -> timedelta:
+        stamp = time.mktime(dt.replace(tzinfo=None).timetuple()[:8] + (-1,)) if dt else time.time()
+        return timedelta(hours=1) if time.localtime(stamp).tm_isdst > 0 else timedelta(0)
+
+    def tzname(self, dt: datetime | None) -> str:
+        stamp = time.mktime(dt.replace(tzinfo=None).timetuple()[:8] + (-1,)) if dt else time.time()
+        return time.localtime(stamp).tm_zone
+
+    def __repr__(self) -> str:
+        return "LocalTimezone()"
+
+
+def local_zone_name() -> str | None:
+    """IANA name of the system zone from ``$TZ`` or ``/etc/localtime``, if any."""
+    candidates = [os.environ.get("TZ", "").lstrip(":")]
+    try:
+        with open("/etc/timezone", encoding="utf-8") as f:
+            candidates.append(f.read().strip())
+    except OSError:
+        pass
+    real = os.path.realpath("/etc/localtime")
+    if "zoneinfo/" in real:
+        candidates.append(real.split("zoneinfo/", 1)[1])
+    for name in candidates:
+        if name in pytz.all_timezones_set:
+            return name
+    return None
+
+
+def resolve_timezone(name: str | None = None) -> tzinfo:
+    """Return the pytz zone ``name`` or, when empty, the system local zone."""
+    name = name or local_zone_name()
+    if name:
+        return pytz.timezone(name)
+    return LocalTimezone()
+
+
+def utc_to_local(value: datetime, tz: tzinfo) -> datetime:
+    """Convert a naive UTC datetime (as stored in the DB) to ``tz``."""
+    return value.replace(tzinfo=pytz.utc).astimezone(tz)
+
+
+@functools.lru_cache(maxsize=32)
+def _transitions(tz: tzinfo) -> tuple[np.ndarray, np.ndarray]:
+    edges = np.array(tz._utc_transition_times, dtype="datetime64[s]").astype(np.int64)
+    offsets = np.array([int(info[0].total_seconds()) for info in tz._transition_info], dtype=np.int64)
+    return edges, offsets
+
+
+def utc_offsets(ts: np.ndarray, tz: tzinfo) -> np.ndarray:
+    """UTC offsets in seconds of ``tz`` at each Unix timestamp in ``ts``."""
+    ts = np.asarray(ts, dtype=np.int64)
+    if hasattr(tz, "_utc_transition_times"):  # pytz zone with DST rules
+        edges, offsets = _transitions(tz)
+        return offsets[np.maximum(np.searchsorted(edges, ts, side="right") - 1, 0)]
+    # Other tzinfo: one lookup per distinct hour (offsets change on the hour).
+    hours, inverse = np.unique(ts // 3600, return_inverse=True)
+    per_hour = np.array(
+        [int(datetime.fromtimestamp(h * 3600, timezone.utc).astimezone(tz).utcoffset().total_seconds())
+         for h in hours.tolist()],
+        dtype=np.int64,
+    )
+    return per_hour[inverse] if len(hours) else np.empty(0, dtype=np.int64)
@@ -1,29 +1,104 @@
 """Folder watching and hashing utilities."""
+from __future__ import annotations
+
+import fnmatch
 import hashlib
+import logging
+import os
 import pathlib
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import FileCreatedEvent, FileSystemEventHandler
 
+from . import profiling, telemetry
 from .models import Video
 
+VIDEO_SUFFIXES = {".mp4", ".mov", ".mkv"}
+
+LOG = logging.getLogger("ig_scheduler.watcher")
+
+# ``/proc/mounts`` filesystem types on which inotify events are unreliable.
+NETWORK_FS_TYPES = {
+    "cifs", "smb3", "smbfs", "nfs", "nfs4", "afpfs", "9p", "ncpfs",
+    "fuse.sshfs", "fuse.rclone", "davfs", "fuse.davfs2", "glusterfs", "ceph",
+}
+
+# Directories modified this recently are re-listed on the next poll as well.
+MTIME_SETTLE_SECONDS = 3.0
+
 
 class FolderHandler(FileSystemEventHandler):
-    """Handle new files appearing in the watch folder."""
+    """Handle new files appearing in the watch folder.
+
+    ``session_factory`` is called for a short-lived session per ingested
+    file, since events arrive on observer and poller threads.
+    ``include``/``exclude`` are glob patterns. A pattern containing ``/`` is
+    matched against the path relative to ``root``; otherwise against the file
+    name. Without ``include`` the usual video suffixes are accepted.
+    """
 
-    def __init__(self, session):
+    def __init__(
+        self,
+        session_factory,
+        root: str | None = None,
+        include: Sequence[str] | None = None,
+        exclude: Sequence[str] = (),
+    ):
         super().__init__()
-        self.session = session
+        self.session_factory = session_factory
+        self.root = pathlib.Path(root) if root else None
+        self.include = list(include) if include else None
+        self.exclude = list(exclude)
+
+    def accepts(self, path: pathlib.Path) -> bool:
+        if self.root is not None:
+            try:
+                rel = path.relative_to(self.root).as_posix()
+            except ValueError:
+                rel = path.name
+        else:
+            rel = path.name
+        if any(_match(rel, pat) for pat in self.exclude):
+            return False
+        if self.include is None:
+            return path.suffix.lower() in VIDEO_SUFFIXES
+        return any(_match(rel, pat) for pat in self.include)
 
     def on_created(self, event):
         if event.is_directory:
             return
-        path = pathlib.Path(event.src_path)
-        if path.suffix.lower() not in {".mp4", ".mov", ".mkv"}:
+        self._ingest(pathlib.Path(event.src_path))
+
+    def on_moved(self, event):
+        # Editors often copy to a temp name and rename when done.
+        if event.is_directory:
+            return
+        self._ingest(pathlib.Path(event.dest_path))
+
+    @profiling.profiled("watcher.ingest")
+    def _ingest(self, path: pathlib.Path) -> None:
+        if not self.accepts(path):
             return
-        sha256 = _hash_file(path)
-        if not self.session.query(Video).filter_by(sha256=sha256).first():
-            self.session.add(Video(file_path=str(path), sha256=sha256))
-            self.session.commit()
+        with telemetry.span("hash", file=str(path)):
+            sha256 = _hash_file(path)
+        with self.session_factory() as session:
+            if not session.query(Video).filter_by(sha256=sha256).first():
+                session.add(Video(file_path=str(path), sha256=sha256))
+                session.commit()
+                telemetry.inc("ig_events", event="ingested")
+            else:
+                telemetry.inc("ig_events", event="duplicate")
+
+
+def _match(rel: str, pattern: str) -> bool:
+    if "/" in pattern:
+        return fnmatch.fnmatch(rel, pattern)
+    return fnmatch.fnmatch(rel.rsplit("/", 1)[-1], pattern)
 
 
 def _hash_file(path: pathlib.Path, chunk_size: int = 8192) -> str:
@@ -34,11 +109,239 @@ def _hash_file(path: pathlib.Path, chunk_size: int = 8192) -> str:
     return h.hexdigest()
 
 
-def start_watcher(folder: str, session) -> Observer:
+# ---------------------------------------------------------------------------
+# Network filesystem detection
+# ---------------------------------------------------------------------------
+def _unescape_mount(path: str) -> str:
+    return path.replace("\\040", " ").replace("\\011", "\t").replace("\\134", "\\")
+
+
+def is_network_path(path: str) -> bool:
+    """Best-effort check whether ``path`` lives on a network filesystem."""
+    if sys.platform.startswith("win"):
+        if path.startswith("\\\\") or path.startswith("//"):
+            return True
+        import ctypes
+
+        drive = os.path.splitdrive(os.path.abspath(path))[0] + "\\"
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f if line.strip()]
+    except OSError:
+        return False
+    real = os.path.realpath(path)
+    best, fstype = "", ""
+    for mnt, kind in mounts:
+        mnt = _unescape_mount(mnt)
+        prefix = mnt.rstrip("/") + "/"
+        if (real == mnt or real.startswith(prefix) or mnt == "/") and len(mnt) > len(best):
+            best, fstype = mnt, kind
+    return fstype in NETWORK_FS_TYPES or fstype.startswith("nfs")
+
+
+# ---------------------------------------------------------------------------
+# Polling fallback
+# ---------------------------------------------------------------------------
+class StatDiffPoller(threading.Thread):
+    """Poll a tree for new files without relying on filesystem events.
+
+    Only directory mtimes are checked each round; a directory is re-listed
+    only when its mtime changed, so the cost tracks the number of
+    directories and what changed, not the number of files. New files are
+    reported once their size has stayed the same for one interval, which
+    avoids hashing clips that are still being copied.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self._watches: list[tuple[FileSystemEventHandler, str, bool]] = []
+        self._dirs: dict[str, tuple[int, set[str]]] = {}
+        self._pending: dict[str, tuple[FileSystemEventHandler, int]] = {}
+        self._stopped = threading.Event()
+
+    # Observer-compatible API -------------------------------------------
+    def schedule(self, handler, path: str, recursive: bool = False) -> None:
+        self._watches.append((handler, os.path.abspath(path), recursive))
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        self.prime()
+        while not self._stopped.wait(self.interval):
+            self.poll()
+
+    # Polling -----------------------------------------------------------
+    def prime(self) -> None:
+        """Record the current tree; files already present are not reported.
+
+        A root that cannot be listed yet stays scheduled and is scanned once
+        it becomes reachable, reporting whatever it holds then.
+        """
+        for handler, root, recursive in self._watches:
+            self._scan(root, recursive, handler, emit=False)
+
+    @profiling.profiled("watcher.poll")
+    def poll(self) -> None:
+        """Run one round of checks."""
+        self._flush_pending()
+        for handler, root, recursive in self._watches:
+            if not os.path.isdir(root):
+                continue  # unreachable (share dropped, not mounted yet); keep its state
+            if root not in self._dirs:
+                # Missing when primed: everything in it is new.
+                self._scan(root, recursive, handler, emit=True)
+                continue
+            for directory in [d for d in self._dirs if _within(d, root)]:
+                self._check(directory, root, recursive, handler)
+
+    def _check(self, directory: str, root: str, recursive: bool, handler) -> None:
+        if directory not in self._dirs:
+            return  # dropped earlier in this round
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            if os.path.isdir(root):
+                self._forget(directory)  # removed; the share itself is still there
+            return
+        if mtime != self._dirs[directory][0]:
+            self._scan(directory, recursive, handler, emit=True, recurse_known=False)
+
+    def _scan(self, directory: str, recursive: bool, handler, emit: bool, recurse_known: bool = True) -> None:
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        old = self._dirs.get(directory, (0, set()))[1]
+        names = set()
+        for entry in entries:
+            names.add(entry.name)
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if recursive and (recurse_known or entry.path not in self._dirs):
+                    # New sub-directories are scanned (and emitted) right away.
+                    self._scan(entry.path, recursive, handler, emit)
+            elif emit and entry.name not in old:
+                try:
+                    self._pending[entry.path] = (handler, entry.stat().st_size)
+                except OSError:
+                    pass
+        for gone in old - names:
+            self._forget(os.path.join(directory, gone))
+        if time.time() - mtime / 1e9 < MTIME_SETTLE_SECONDS:
+            # Coarse (e.g. SMB) timestamps may not change again for a file
+            # added in the same tick, so look at this directory next round too.
+            mtime = 0
+        self._dirs[directory] = (mtime, names)
+
+    def _flush_pending(self) -> None:
+        for path, (handler, size) in list(self._pending.items()):
+            try:
+                current = os.stat(path).st_size
+            except OSError:
+                del self._pending[path]
+                continue
+            if current != size:
+                self._pending[path] = (handler, current)
+                continue
+            del self._pending[path]
+            handler.dispatch(FileCreatedEvent(path))
+
+    def _forget(self, directory: str) -> None:
+        for d in [d for d in self._dirs if _within(d, directory)]:
+            del self._dirs[d]
+
+
+def _within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+# ---------------------------------------------------------------------------
+# Watch roots
+# ---------------------------------------------------------------------------
+@dataclass
+class WatchRoot:
+    """One watched folder and its settings (``poll``: "auto", True or False)."""
+
+    path: str
+    recursive: bool = True
+    include: list[str] | None = None
+    exclude: list[str] = field(default_factory=list)
+    poll: bool | str = "auto"
+    poll_interval: float = 10.0
+
+    def use_polling(self) -> bool:
+        if self.poll == "auto":
+            return is_network_path(self.path)
+        return bool(self.poll)
+
+
+def roots_from_settings(settings: dict) -> list[WatchRoot]:
+    """Build roots from ``watch_roots`` plus the legacy ``watch_folder``."""
+    roots = [
+        WatchRoot(**r) if isinstance(r, dict) else WatchRoot(str(r))
+        for r in settings.get("watch_roots", [])
+    ]
+    if settings.get("watch_folder"):
+        roots.append(WatchRoot(settings["watch_folder"], recursive=False))
+    return roots
+
+
+class WatcherGroup:
+    """Start/stop several observers and pollers as one."""
+
+    def __init__(self, observers: Iterable):
+        self.observers = list(observers)
+
+    def stop(self) -> None:
+        for obs in self.observers:
+            obs.stop()
+
+    def join(self, timeout: float | None = None) -> None:
+        for obs in self.observers:
+            obs.join(timeout)
+
+
+def start_watcher(folder: str, session_factory) -> Observer:
     """Start an Observer thread watching the given folder."""
-    handler = FolderHandler(session)
+    handler = FolderHandler(session_factory)
     obs = Observer()
     obs.schedule(handler, folder, recursive=False)
     obs.daemon = True
     obs.start()
     return obs
+
+
+def start_watchers(roots: Sequence[WatchRoot], session_factory) -> WatcherGroup:
+    """Watch every root: native events where possible, polling on network shares.
+
+    All native roots share one Observer and all polled roots one poller
+    thread, which runs at the shortest ``poll_interval`` among them.
+    """
+    native = poller = None
+    observers = []
+    for root in roots:
+        handler = FolderHandler(session_factory, root.path, root.include, root.exclude)
+        if root.use_polling():
+            if poller is None:
+                poller = StatDiffPoller(root.poll_interval)
+                observers.append(poller)
+            poller.interval = min(poller.interval, root.poll_interval)
+            poller.schedule(handler, root.path, recursive=root.recursive)
+        elif not os.path.isdir(root.path):
+            LOG.warning("watch root %s does not exist; not watching it", root.path)
+        else:
+            if native is None:
+                native = Observer()
+                native.daemon = True
+                observers.append(native)
+            native.schedule(handler, root.path, recursive=root.recursive)
+    for obs in observers:
+        obs.start()
+    return WatcherGroup(observers)
@@ -0,0 +1,52 @@
+"""Command line entry point: ``python -m benchmarks``."""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from . import suites  # noqa: F401 - registers benchmarks
+from .harness import (
+    BASELINE_PATH,
+    REGISTRY,
+    compare,
+    format_comparison,
+    load_baseline,
+    run_all,
+    save_baseline,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument("names", nargs="*", help=f"subset to run ({', '.join(REGISTRY)})")
+    parser.add_argument("--full", action="store_true", help="include the largest sizes (slow)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="ratio above which a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - set(REGISTRY)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = run_all(args.names, full=args.full)
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("No baseline found; run with --save to create one.")
+        return 0
+
+    rows = compare(load_baseline(args.baseline), results, args.threshold)
+    print()
+    print(format_comparison(rows))
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
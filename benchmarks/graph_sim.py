@@ -0,0 +1,327 @@
+"""Local stand-in for the Instagram Graph API used for load testing.
+
+The simulator implements the handful of endpoints ``backend.instagram``
+talks to (container creation, status polling, publishing, media metrics and
+``content_publishing_limit``) on a threaded localhost HTTP server. Latency,
+container processing time, error rates, rate limiting and the 24 hour
+publishing quota are configurable through :class:`SimulatorConfig`.
+
+Run it standalone with ``python -m benchmarks.graph_sim --port 8765`` and set
+``"graph_api_base": "http://127.0.0.1:8765"`` in ``settings.json`` to point
+the app at it.
+"""
+from __future__ import annotations
+
+import contextlib
+import http.server
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from backend import instagram
+
+
+@dataclass
+class SimulatorConfig:
+    """Behaviour knobs for :class:`GraphAPISimulator`."""
+
+    latency: float = 0.0  # fixed seconds added to every response
+    latency_jitter: float = 0.0  # extra uniform random delay
+    processing_time: float = 0.0  # seconds a container stays IN_PROGRESS
+    processing_jitter: float = 0.0
+    error_rate: float = 0.0  # fraction of containers that end in ERROR
+    container_ttl: float = 24 * 3600  # unpublished containers then EXPIRE
+    fetch_media: bool = True  # download ``video_url`` like Instagram does
+    rate_limit_calls: int = 0  # calls per window before throttling; 0 disables
+    rate_limit_window: float = 3600.0
+    publish_limit: int = 50  # posts per rolling 24 hours
+    seed: int | None = None
+
+
+class _Container:
+    __slots__ = ("id", "created", "ready_at", "failed", "fetching", "published")
+
+    def __init__(self, cid: str, created: float, ready_at: float, failed: bool):
+        self.id = cid
+        self.created = created
+        self.ready_at = ready_at
+        self.failed = failed
+        self.fetching = False
+        self.published = False
+
+
+class GraphAPISimulator:
+    """Threaded HTTP server emulating the Graph API endpoints we use."""
+
+    def __init__(self, config: SimulatorConfig | None = None, port: int = 0):
+        self.config = config or SimulatorConfig()
+        self.port = port
+        self.stats: Counter = Counter()
+        self.fetched_bytes = 0
+        self._rng = random.Random(self.config.seed)
+        self._ids = itertools.count(17_800_000_000_000_000)
+        self._lock = threading.Lock()
+        self._containers: dict[str, _Container] = {}
+        self._media: dict[str, float] = {}
+        self._publishes: deque = deque()
+        self._calls: deque = deque()
+        self._server: http.server.ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> str:
+        """Start serving in a daemon thread and return the base URL."""
+        if self._server:
+            return self.url
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", self.port), _make_handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @contextlib.contextmanager
+    def attached(self, poll_seconds: float = 0.05):
+        """Point ``backend.instagram`` at this simulator for the block."""
+        self.start()
+        previous = instagram.set_api_base(self.url)
+        previous_poll = instagram.STATUS_POLL_SECONDS
+        instagram.STATUS_POLL_SECONDS = poll_seconds
+        try:
+            yield self
+        finally:
+            instagram.set_api_base(previous)
+            instagram.STATUS_POLL_SECONDS = previous_poll
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+    def handle(self, method: str, path: str, params: dict) -> tuple[int, dict, dict]:
+        """Return ``(status, headers, body)`` for a request."""
+        cfg = self.config
+        delay = cfg.latency + (self._rng.uniform(0, cfg.latency_jitter) if cfg.latency_jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        now = time.time()
+        parts = [p for p in path.split("/") if p]
+        with self._lock:
+            self.stats[f"{method} {self._route(parts)}"] += 1
+            headers = self._rate_limit_headers(now)
+            if cfg.rate_limit_calls and len(self._calls) > cfg.rate_limit_calls:
+                self.stats["throttled"] += 1
+                return 400, headers, _error(4, "Application request limit reached")
+
+        if not params.get("access_token"):
+            return 400, headers, _error(190, "An active access token must be used")
+        if not parts:
+            return 404, headers, _error(803, "Unknown path")
+
+        if method == "POST" and len(parts) == 2 and parts[1] == "media":
+            return 200, headers, self._create_container(params, now)
+        if method == "POST" and len(parts) == 2 and parts[1] == "media_publish":
+            return self._publish(params.get("creation_id", ""), now, headers)
+        if method == "GET" and len(parts) == 2 and parts[1] == "content_publishing_limit":
+            with self._lock:
+                usage = self._publish_usage(now)
+            return 200, headers, {"data": [{
+                "quota_usage": usage,
+                "config": {"quota_total": cfg.publish_limit, "quota_duration": 86400},
+            }]}
+        if method == "GET" and len(parts) == 1:
+            return self._get_object(parts[0], params, now, headers)
+        return 404, headers, _error(803, "Unknown path")
+
+    @staticmethod
+    def _route(parts: list[str]) -> str:
+        if len(parts) == 2:
+            return f"/{{id}}/{parts[1]}"
+        return "/{id}" if parts else "/"
+
+    def _rate_limit_headers(self, now: float) -> dict:
+        cfg = self.config
+        self._calls.append(now)
+        while self._calls and self._calls[0] < now - cfg.rate_limit_window:
+            self._calls.popleft()
+        if not cfg.rate_limit_calls:
+            return {}
+        pct = min(100, int(100 * len(self._calls) / cfg.rate_limit_calls))
+        usage = json.dumps({"call_count": pct, "total_time": pct, "total_cputime": pct})
+        return {"X-App-Usage": usage}
+
+    def _publish_usage(self, now: float) -> int:
+        while self._publishes and self._publishes[0] < now - 86400:
+            self._publishes.popleft()
+        return len(self._publishes)
+
+    def _create_container(self, params: dict, now: float) -> dict:
+        cfg = self.config
+        with self._lock:
+            cid = str(next(self._ids))
+            ready = now + cfg.processing_time + self._rng.uniform(0, cfg.processing_jitter)
+            failed = self._rng.random() < cfg.error_rate
+            container = self._containers[cid] = _Container(cid, now, ready, failed)
+            url = params.get("video_url")
+            container.fetching = bool(cfg.fetch_media and url)
+        if container.fetching:
+            threading.Thread(target=self._fetch, args=(cid, url), daemon=True).start()
+        return {"id": cid}
+
+    def _fetch(self, cid: str, url: str) -> None:
+        try:
+            with urllib.request.urlopen(url, timeout=30) as resp:
+                size = 0
+                for blk in iter(lambda: resp.read(1 << 16), b""):
+                    size += len(blk)
+        except Exception:
+            with self._lock:
+                self._containers[cid].failed = True
+                self._containers[cid].fetching = False
+                self.stats["fetch_failed"] += 1
+            return
+        with self._lock:
+            self._containers[cid].fetching = False
+            self.fetched_bytes += size
+
+    def _status(self, container: _Container, now: float) -> str:
+        if container.published:
+            return "PUBLISHED"
+        if container.failed:
+            return "ERROR"
+        if now - container.created > self.config.container_ttl:
+            return "EXPIRED"
+        if container.fetching or now < container.ready_at:
+            return "IN_PROGRESS"
+        return "FINISHED"
+
+    def _publish(self, creation_id: str, now: float, headers: dict):
+        with self._lock:
+            container = self._containers.get(creation_id)
+            if container is None:
+                return 400, headers, _error(100, "Invalid creation_id")
+            if self._publish_usage(now) >= self.config.publish_limit:
+                self.stats["publish_limited"] += 1
+                body = _error(9, "Application request limit reached")
+                body["error"]["error_subcode"] = 2207042
+                return 400, headers, body
+            if self._status(container, now) != "FINISHED":
+                return 400, headers, _error(9007, "Media ID is not available")
+            container.published = True
+            self._publishes.append(now)
+            media_id = str(next(self._ids))
+            self._media[media_id] = now
+        return 200, headers, {"id": media_id}
+
+    def _get_object(self, obj_id: str, params: dict, now: float, headers: dict):
+        with self._lock:
+            container = self._containers.get(obj_id)
+            if container is not None:
+                return 200, headers, {"id": obj_id, "status_code": self._status(container, now)}
+            published = self._media.get(obj_id)
+        if published is None:
+            return 400, headers, _error(100, "Object does not exist")
+        # Deterministic, slowly growing engagement numbers.
+        age = max(0.0, now - published)
+        seed = int(obj_id) % 97 + 1
+        views = int(seed * 10 + age / 6)
+        return 200, headers, {
+            "id": obj_id,
+            "like_count": views // 10,
+            "comments_count": views // 100,
+            "video_view_count": views,
+        }
+
+
+def _error(code: int, message: str) -> dict:
+    return {"error": {"message": message, "type": "OAuthException", "code": code}}
+
+
+def _make_handler(sim: GraphAPISimulator):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _dispatch(self, method: str) -> None:
+            url = urllib.parse.urlsplit(self.path)
+            params = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                body = self.rfile.read(length).decode()
+                params.update({k: v[-1] for k, v in urllib.parse.parse_qs(body).items()})
+            status, headers, payload = sim.handle(method, url.path, params)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+            pass
+
+    return Handler
+
+
+def main(argv=None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the Graph API simulator until interrupted.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--processing", type=float, default=2.0, help="container processing seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--publish-limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    sim = GraphAPISimulator(
+        SimulatorConfig(
+            latency=args.latency,
+            processing_time=args.processing,
+            error_rate=args.error_rate,
+            publish_limit=args.publish_limit,
+        ),
+        port=args.port,
+    )
+    with sim:
+        print(f"Graph API simulator on {sim.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
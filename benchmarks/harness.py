@@ -0,0 +1,135 @@
+"""Timing helpers and JSON baseline storage for the benchmark suite."""
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark, optionally parametrised over sizes."""
+
+    name: str
+    func: Callable
+    params: List = field(default_factory=lambda: [None])
+    full_params: List = field(default_factory=list)
+    repeat: int = 3
+
+    def cases(self, full: bool = False) -> Iterable:
+        yield from self.params
+        if full:
+            yield from self.full_params
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, params=None, full_params=None, repeat: int = 3):
+    """Register ``func`` as a benchmark.
+
+    ``func(param)`` must return a zero-argument callable that performs the
+    timed work; everything before the return is untimed setup.
+    """
+
+    def deco(func):
+        REGISTRY[name] = Benchmark(
+            name,
+            func,
+            list(params) if params else [None],
+            list(full_params or []),
+            repeat,
+        )
+        return func
+
+    return deco
+
+
+def measure(run: Callable[[], object], repeat: int = 3) -> dict:
+    """Time ``run`` ``repeat`` times and return summary statistics."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "repeat": repeat,
+    }
+
+
+def case_key(name: str, param) -> str:
+    return name if param is None else f"{name}[{param}]"
+
+
+def run_all(selected: Iterable[str] | None = None, full: bool = False, log=print) -> dict:
+    """Run the registered benchmarks and return ``{case: stats}``."""
+    results = {}
+    names = list(selected) if selected else list(REGISTRY)
+    for name in names:
+        bench = REGISTRY[name]
+        for param in bench.cases(full):
+            key = case_key(name, param)
+            try:
+                run = bench.func(param) if param is not None else bench.func()
+            except ImportError as exc:
+                log(f"{key:<45} skipped ({exc})")
+                continue
+            stats = measure(run, bench.repeat)
+            results[key] = stats
+            log(f"{key:<45} {stats['median'] * 1000:10.2f} ms")
+    return results
+
+
+def save_baseline(results: dict, path: Path = BASELINE_PATH) -> None:
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    return json.loads(path.read_text())["results"]
+
+
+def compare(baseline: dict, current: dict, threshold: float = 1.2) -> List[dict]:
+    """Compare median timings; return one row per case present in both.
+
+    A case is flagged as a regression when it is more than ``threshold``
+    times slower than the baseline.
+    """
+    rows = []
+    for key in sorted(set(baseline) & set(current)):
+        old = baseline[key]["median"]
+        new = current[key]["median"]
+        ratio = new / old if old else float("inf")
+        rows.append({
+            "case": key,
+            "baseline": old,
+            "current": new,
+            "ratio": ratio,
+            "regression": ratio > threshold,
+        })
+    return rows
+
+
+def format_comparison(rows: List[dict]) -> str:
+    lines = [f"{'case':<45} {'baseline':>12} {'current':>12} {'ratio':>7}"]
+    for row in rows:
+        flag = "  SLOWER" if row["regression"] else ""
+        lines.append(
+            f"{row['case']:<45} {row['baseline'] * 1000:10.2f}ms "
+            f"{row['current'] * 1000:10.2f}ms {row['ratio']:7.2f}{flag}"
+        )
+    return "\n".join(lines)
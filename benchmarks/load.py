@@ -0,0 +1,143 @@
+"""Drive the posting pipeline against the local Graph API simulator.
+
+Usage::
+
+    python -m benchmarks.load --posts 2000 --concurrency 16 --processing 0.5
+    python -m benchmarks.load --mode scheduler --posts 5000 --error-rate 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import credentials, instagram, scheduler
+from benchmarks.graph_sim import GraphAPISimulator, SimulatorConfig
+from backend.models import Base, Video
+
+
+def _make_files(count: int, size: int) -> list[Path]:
+    folder = Path(tempfile.mkdtemp(prefix="ig_load_"))
+    paths = []
+    for i in range(count):
+        path = folder / f"clip_{i}.mp4"
+        path.write_bytes(i.to_bytes(8, "big") + os.urandom(max(0, size - 8)))
+        paths.append(path)
+    return paths
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_posts(paths: list[Path], concurrency: int) -> dict:
+    """Call ``post_to_instagram`` for every path across worker threads."""
+    session = SimpleNamespace(settings={"instagram_user_id": "1"})
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def post(path: Path) -> None:
+        nonlocal errors
+        video = SimpleNamespace(file_path=str(path), title=path.stem, description="", insta_media_id=None)
+        start = time.perf_counter()
+        try:
+            instagram.post_to_instagram(session, video)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(post, paths))
+    return {"elapsed": time.perf_counter() - start, "latencies": latencies, "errors": errors}
+
+
+def run_scheduler(paths: list[Path]) -> dict:
+    """Run ``post_due_videos`` then ``refresh_metrics`` over a fresh database."""
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.settings = {"instagram_user_id": "1"}
+    due = datetime.utcnow() - timedelta(minutes=1)
+    session.add_all(Video(file_path=str(p), sha256=p.stem, scheduled_at=due) for p in paths)
+    session.commit()
+
+    start = time.perf_counter()
+    scheduler.post_due_videos(session, max_posts_per_day=len(paths))
+    posted = time.perf_counter() - start
+    instagram.refresh_metrics(session)
+    refreshed = time.perf_counter() - start - posted
+    errors = session.query(Video).filter(Video.last_error.isnot(None)).count()
+    return {
+        "elapsed": posted,
+        "latencies": [posted / max(1, len(paths) - errors)],
+        "errors": errors,
+        "refresh_seconds": refreshed,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["post", "scheduler"], default="post")
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--size", type=int, default=256 * 1024, help="bytes per simulated clip")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--processing", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="calls per hour before throttling")
+    parser.add_argument("--publish-limit", type=int, default=10 ** 9)
+    args = parser.parse_args(argv)
+
+    config = SimulatorConfig(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        processing_time=args.processing,
+        error_rate=args.error_rate,
+        rate_limit_calls=args.rate_limit,
+        publish_limit=args.publish_limit,
+    )
+    paths = _make_files(args.posts, args.size)
+    sim = GraphAPISimulator(config)
+    with sim, sim.attached(), \
+            mock.patch.object(credentials.keyring, "get_password", lambda *a, **k: "token"):
+        if args.mode == "post":
+            result = run_posts(paths, args.concurrency)
+        else:
+            result = run_scheduler(paths)
+    instagram.stop_http_server()
+
+    done = len(result["latencies"]) if args.mode == "post" else args.posts - result["errors"]
+    print(f"posted      {done}/{args.posts} ({result['errors']} errors)")
+    print(f"elapsed     {result['elapsed']:.2f} s")
+    print(f"throughput  {done / result['elapsed']:.1f} posts/s")
+    if args.mode == "post" and result["latencies"]:
+        lat = result["latencies"]
+        print(f"latency     p50 {statistics.median(lat) * 1000:.1f} ms, "
+              f"p95 {_percentile(lat, 0.95) * 1000:.1f} ms, max {max(lat) * 1000:.1f} ms")
+    if "refresh_seconds" in result:
+        print(f"refresh     {result['refresh_seconds']:.2f} s")
+    print(f"simulator   {dict(sim.stats)}; fetched {sim.fetched_bytes} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Benchmarks for ingest, scheduling, posting and GUI load."""
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import pytz
+
+from backend import analytics, credentials, instagram, scheduler, slots, watcher
+from backend.models import Base, MetricSample, Video
+
+from .harness import benchmark
+
+_TMP = Path(tempfile.mkdtemp(prefix="ig_bench_"))
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.settings = {"instagram_user_id": "1"}
+    return session
+
+
+def _populate(session, rows: int, due: int = 50, media: bool = False) -> None:
+    """Insert ``rows`` videos: mostly posted history, some future, ``due`` overdue."""
+    now = datetime.utcnow()
+    batch = []
+    for i in range(rows):
+        row = {"file_path": f"/videos/{i}.mp4", "sha256": f"{i:064x}"}
+        if i < due:
+            row["scheduled_at"] = now - timedelta(minutes=i + 1)
+        elif i % 10 == 0:
+            row["scheduled_at"] = now + timedelta(minutes=i)
+        else:
+            row["scheduled_at"] = now - timedelta(days=i % 365 + 1)
+            row["posted_at"] = row["scheduled_at"]
+            if media:
+                row["insta_media_id"] = str(i)
+        batch.append(row)
+        if len(batch) == 50_000:
+            session.execute(insert(Video), batch)
+            batch.clear()
+    if batch:
+        session.execute(insert(Video), batch)
+    session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Hashing and ingest
+# ---------------------------------------------------------------------------
+@benchmark("hash_file", params=["64KiB", "1MiB", "16MiB"], full_params=["256MiB"])
+def bench_hash_file(size: str):
+    units = {"KiB": 1024, "MiB": 1024 ** 2}
+    nbytes = int(size[:-3]) * units[size[-3:]]
+    path = _TMP / f"hash_{size}.bin"
+    if not path.exists() or path.stat().st_size != nbytes:
+        with path.open("wb") as f:
+            chunk = os.urandom(1024 ** 2)
+            for offset in range(0, nbytes, len(chunk)):
+                f.write(chunk[: nbytes - offset])
+    return lambda: watcher._hash_file(path)
+
+
+@benchmark("folder_handler_ingest", params=[100, 1000], full_params=[10_000])
+def bench_ingest(count: int):
+    folder = _TMP / f"ingest_{count}"
+    folder.mkdir(exist_ok=True)
+    events = []
+    for i in range(count):
+        path = folder / f"clip_{i}.mp4"
+        if not path.exists():
+            path.write_bytes(os.urandom(4096))
+        events.append(SimpleNamespace(src_path=str(path), is_directory=False))
+
+    def run():
+        handler = watcher.FolderHandler(sessionmaker(bind=_session().get_bind()))
+        for event in events:
+            handler.on_created(event)
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Scheduler queries
+# ---------------------------------------------------------------------------
+@benchmark("post_due_videos", params=[10_000, 100_000], full_params=[1_000_000])
+def bench_post_due_videos(rows: int):
+    session = _session()
+    _populate(session, rows)
+
+    def fail(session_arg, video):
+        # Failing keeps the due set identical between repeats.
+        raise RuntimeError("benchmark")
+
+    def run():
+        with mock.patch.object(scheduler, "post_to_instagram", fail):
+            scheduler.post_due_videos(session, max_posts_per_day=25)
+
+    return run
+
+
+@benchmark("daily_quota_query", params=[10_000, 100_000], full_params=[1_000_000])
+def bench_daily_quota(rows: int):
+    session = _session()
+    _populate(session, rows, due=0)
+
+    def run():
+        scheduler.daily_allowance(session, 25)
+
+    return run
+
+
+@benchmark("schedule_backlog", params=[2000], full_params=[20_000])
+def bench_schedule_backlog(backlog: int):
+    session = _session()
+    _populate(session, 10_000, due=0)
+    session.execute(insert(Video), [
+        {"file_path": f"/backlog/{i}.mp4", "sha256": f"b{i}"} for i in range(backlog)
+    ])
+    session.commit()
+    template = [time(h, m) for h in range(8, 20) for m in (0, 30)]
+    settings = {"timezone": "Europe/Berlin", "max_posts_per_day": 25}
+
+    def run():
+        session.query(Video).filter(Video.file_path.like("/backlog/%")).update({"scheduled_at": None})
+        slots.schedule_backlog(session, template, settings)
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Metrics refresh against a mocked Graph API
+# ---------------------------------------------------------------------------
+@benchmark("refresh_metrics", params=[10_000])
+def bench_refresh_metrics(media: int):
+    session = _session()
+    _populate(session, int(media / 0.9), due=0, media=True)
+    payload = {"like_count": 1, "comments_count": 2, "video_view_count": 3}
+    response = SimpleNamespace(json=lambda: payload)
+
+    def run():
+        with mock.patch.object(instagram.requests, "get", lambda *a, **k: response), \
+                mock.patch.object(credentials.keyring, "get_password", lambda *a, **k: "token"):
+            instagram.refresh_metrics(session)
+
+    return run
+
+
+@benchmark("analytics_post_stats", params=[1000], full_params=[5000])
+def bench_post_stats(posts: int):
+    """A year of daily (downsampled) samples for ``posts`` posts."""
+    session = _session()
+    start = datetime(2025, 1, 1)
+    session.execute(insert(Video), [
+        {"id": i + 1, "file_path": f"{i}.mp4", "sha256": str(i),
+         "posted_at": start + timedelta(hours=7 * i)}
+        for i in range(posts)
+    ])
+    base = int(start.replace(tzinfo=pytz.utc).timestamp())
+    batch = []
+    for i in range(posts):
+        posted = base + 7 * 3600 * i
+        for day in range(365):
+            batch.append({"video_id": i + 1, "ts": posted + 3600 + day * 86400,
+                          "likes": day * (i % 13), "comments": day, "views": 10 * day})
+        if len(batch) >= 100_000:
+            session.execute(insert(MetricSample), batch)
+            batch.clear()
+    if batch:
+        session.execute(insert(MetricSample), batch)
+    session.commit()
+
+    def run():
+        stats = analytics.post_stats(session, pytz.utc)
+        analytics.best_hours_of_week(stats)
+        analytics.suggest_template(stats)
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# GUI
+# ---------------------------------------------------------------------------
+@benchmark("main_window_load_videos", params=[1000, 10_000], repeat=1)
+def bench_load_videos(rows: int):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import QtGui, QtWidgets
+    from gui import widgets
+    from gui.main_window import MainWindow
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    session = _session()
+    _populate(session, rows, due=0)
+
+    # ffmpeg is stubbed so the numbers track widget/DB cost, not subprocesses.
+    with mock.patch.object(widgets, "_generate_thumbnail", lambda p: QtGui.QPixmap()):
+        win = MainWindow(session, scheduler=None)
+
+    def run():
+        with mock.patch.object(widgets, "_generate_thumbnail", lambda p: QtGui.QPixmap()):
+            win.load_videos()
+            app.processEvents()
+
+    return run
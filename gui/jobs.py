@@ -0,0 +1,63 @@
+"""Run bulk backend actions on a thread pool and report back via signals."""
+from __future__ import annotations
+
+from typing import Callable, Sequence
+
+from PySide6 import QtCore
+
+from backend import bulk
+
+
+class JobRunner(QtCore.QObject):
+    """Submit ``backend.bulk`` actions; results arrive as Qt signals.
+
+    Each job opens its own session from ``session_factory`` so the GUI
+    thread's session is never touched off-thread.
+    """
+
+    progress = QtCore.Signal(str, int, int)  # action, done, total
+    finished = QtCore.Signal(object)  # BulkResult
+    failed = QtCore.Signal(str, str)  # action, message
+
+    def __init__(self, session_factory: Callable, settings: Callable[[], dict], parent=None):
+        super().__init__(parent)
+        self.session_factory = session_factory
+        self.settings = settings
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)  # one job at a time keeps SQLite writes serial
+
+    def submit(self, action: str, video_ids: Sequence[int], **options) -> None:
+        if not video_ids:
+            return
+        self.pool.start(_Job(self, action, list(video_ids), options))
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+
+class _Job(QtCore.QRunnable):
+    def __init__(self, runner: JobRunner, action: str, video_ids: list[int], options: dict):
+        super().__init__()
+        self.runner = runner
+        self.action = action
+        self.video_ids = video_ids
+        self.options = options
+
+    def run(self) -> None:
+        runner = self.runner
+        session = runner.session_factory()
+        session.settings = dict(runner.settings())
+        try:
+            result = bulk.ACTIONS[self.action](
+                session,
+                self.video_ids,
+                progress=lambda done, total: runner.progress.emit(self.action, done, total),
+                **self.options,
+            )
+        except Exception as exc:
+            session.rollback()
+            runner.failed.emit(self.action, str(exc))
+        else:
+            runner.finished.emit(result)
+        finally:
+            session.close()
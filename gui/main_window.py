@@ -1,24 +1,52 @@
 """Main application window."""
-from datetime import datetime
+import time
+from datetime import time as dt_time
 from pathlib import Path
 
 from PySide6 import QtCore, QtWidgets
-from send2trash import send2trash
+from sqlalchemy.orm import sessionmaker
 
+from .jobs import JobRunner
 from .widgets import VideoItemWidget
 
+from backend import analytics, profiling, service, slots
 from backend.models import Video
-from backend.instagram import post_to_instagram
+from backend.timezones import resolve_timezone
 from .schedule_dialog import ScheduleDialog
 
 
 class MainWindow(QtWidgets.QMainWindow):
     """Very small GUI showcasing the core workflow."""
 
-    def __init__(self, session, scheduler, parent=None):
+    template_suggested = QtCore.Signal(object)  # list[datetime.time]
+
+    def __init__(
+        self,
+        session,
+        scheduler,
+        parent=None,
+        session_factory=None,
+        jobs=None,
+        settings_path=None,
+    ):
         super().__init__(parent)
         self.session = session
         self.scheduler = scheduler
+        self.settings_path = settings_path
+        self.session_factory = session_factory or sessionmaker(bind=session.get_bind())
+        self._suggested_template: list[dt_time] = []
+        self.template_suggested.connect(self._on_template_suggested)
+
+        # ``jobs`` may be a WorkerClient when the backend runs out of process.
+        self.jobs = jobs or JobRunner(self.session_factory, lambda: self.settings, self)
+        self.jobs.progress.connect(self._on_job_progress)
+        self.jobs.finished.connect(self._on_job_finished)
+        self.jobs.failed.connect(self._on_job_failed)
+        if hasattr(self.jobs, "changed"):
+            # Coalesce bursts of backend commits into one reload.
+            self._reload_timer = QtCore.QTimer(self, singleShot=True, interval=250)
+            self._reload_timer.timeout.connect(self._reload)
+            self.jobs.changed.connect(self._reload_timer.start)
 
         self.setWindowTitle("Instagram Scheduler")
         self.resize(800, 600)
@@ -29,29 +57,43 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.tree = QtWidgets.QTreeWidget()
         self.tree.setHeaderLabels(["Title", "Status", "Scheduled", "Posted"])
+        self.tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         layout.addWidget(self.tree)
 
         btn_layout = QtWidgets.QHBoxLayout()
         self.btn_refresh = QtWidgets.QPushButton("Refresh")
         self.btn_schedule = QtWidgets.QPushButton("Schedule")
+        self.btn_schedule_backlog = QtWidgets.QPushButton("Schedule Backlog")
+        self.btn_unschedule = QtWidgets.QPushButton("Unschedule")
         self.btn_post_now = QtWidgets.QPushButton("Post Now")
         self.btn_delete = QtWidgets.QPushButton("Delete")
         btn_layout.addWidget(self.btn_refresh)
         btn_layout.addWidget(self.btn_schedule)
+        btn_layout.addWidget(self.btn_schedule_backlog)
+        btn_layout.addWidget(self.btn_unschedule)
         btn_layout.addWidget(self.btn_post_now)
         btn_layout.addWidget(self.btn_delete)
         layout.addLayout(btn_layout)
 
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setVisible(False)
+        self.statusBar().addPermanentWidget(self.progress)
+
         self.btn_refresh.clicked.connect(self.load_videos)
         self.btn_schedule.clicked.connect(self.schedule_selected)
+        self.btn_schedule_backlog.clicked.connect(self.schedule_backlog)
+        self.btn_unschedule.clicked.connect(self.unschedule_selected)
         self.btn_post_now.clicked.connect(self.post_selected)
         self.btn_delete.clicked.connect(self.delete_selected)
 
         self.load_videos()
+        if not self.settings.get("schedule_template"):
+            self.suggest_template()
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    @profiling.profiled("gui.load_videos")
     def load_videos(self) -> None:
         """Populate the tree widget with current videos."""
         self.tree.clear()
@@ -78,54 +120,129 @@ class MainWindow(QtWidgets.QMainWindow):
             )
             self.tree.setItemWidget(item, 0, widget)
 
-    def _current_video(self) -> Video | None:
-        item = self.tree.currentItem()
-        if not item:
-            return None
-        vid_id = item.data(0, QtCore.Qt.UserRole)
-        return self.session.get(Video, vid_id)
+    @property
+    def settings(self) -> dict:
+        return getattr(self.session, "settings", {})
+
+    def suggest_template(self) -> None:
+        """Compute the best posting hours from recent metrics on a pool thread."""
+        factory, settings = self.session_factory, dict(self.settings)
+
+        def work():
+            session = factory()
+            try:
+                tz = resolve_timezone(settings.get("timezone"))
+                stats = analytics.post_stats(session, tz, since=int(time.time()) - 90 * 86400)
+                template = analytics.suggest_template(stats)
+            except Exception:  # no metrics yet, DB busy, ...: keep the dialog default
+                template = []
+            finally:
+                session.close()
+            try:
+                self.template_suggested.emit(template)
+            except RuntimeError:  # window closed meanwhile
+                pass
+
+        QtCore.QThreadPool.globalInstance().start(work)
+
+    def _on_template_suggested(self, template) -> None:
+        self._suggested_template = list(template)
+
+    def _default_template(self) -> list[dt_time]:
+        """Saved template, else the suggestion from recent metrics (if ready)."""
+        saved = self.settings.get("schedule_template")
+        if saved:
+            return [dt_time.fromisoformat(t) for t in saved]
+        return self._suggested_template
+
+    def _ask_template(self) -> list[dt_time]:
+        """Show the template dialog; returns the accepted times (may be empty)."""
+        dlg = ScheduleDialog(self._default_template(), parent=self)
+        if not dlg.exec():
+            return []
+        template = dlg.schedule_template
+        if template:
+            saved = [t.strftime("%H:%M") for t in template]
+            self.settings["schedule_template"] = saved
+            if self.settings_path:
+                service.update_settings(self.settings_path, schedule_template=saved)
+        return template
+
+    def _reload(self) -> None:
+        self.session.expire_all()
+        self.load_videos()
+
+    def _selected_ids(self) -> list[int]:
+        return [item.data(0, QtCore.Qt.UserRole) for item in self.tree.selectedItems()]
+
+    def _set_busy(self, busy: bool) -> None:
+        for btn in (
+            self.btn_schedule,
+            self.btn_schedule_backlog,
+            self.btn_unschedule,
+            self.btn_post_now,
+            self.btn_delete,
+        ):
+            btn.setEnabled(not busy)
+        self.progress.setVisible(busy)
+
+    def _submit(self, action: str, video_ids: list[int], **options) -> None:
+        if not video_ids:
+            return
+        self._set_busy(True)
+        self.progress.setRange(0, len(video_ids))
+        self.progress.setValue(0)
+        self.statusBar().showMessage(f"{action.capitalize()}: {len(video_ids)} video(s)…")
+        self.jobs.submit(action, video_ids, **options)
 
     # ------------------------------------------------------------------
     # Slots
     # ------------------------------------------------------------------
+    @profiling.profiled("gui.schedule_selected")
     def schedule_selected(self) -> None:
-        video = self._current_video()
-        if not video:
+        ids = self._selected_ids()
+        if not ids:
             return
-        dlg = ScheduleDialog(parent=self)
-        if dlg.exec():
-            template = dlg.schedule_template
-            if template:
-                now = datetime.utcnow()
-                dt = datetime.combine(now.date(), template[0])
-                video.scheduled_at = dt
-                self.session.commit()
-                self.load_videos()
+        template = self._ask_template()
+        if template:
+            self._submit("schedule", ids, template=template)
+
+    @profiling.profiled("gui.schedule_backlog")
+    def schedule_backlog(self) -> None:
+        template = self._ask_template()
+        if template:
+            self._submit("schedule", slots.unscheduled_backlog(self.session), template=template)
+
+    @profiling.profiled("gui.unschedule_selected")
+    def unschedule_selected(self) -> None:
+        self._submit("unschedule", self._selected_ids())
 
+    @profiling.profiled("gui.post_selected")
     def post_selected(self) -> None:
-        video = self._current_video()
-        if not video:
-            return
-        try:
-            post_to_instagram(self.session, video)
-            video.posted_at = datetime.utcnow()
-            self.session.commit()
-        except Exception as exc:  # pragma: no cover - network errors
-            video.last_error = str(exc)
-            self.session.commit()
-            QtWidgets.QMessageBox.warning(self, "Error", str(exc))
-        self.load_videos()
+        self._submit("post", self._selected_ids())
 
+    @profiling.profiled("gui.delete_selected")
     def delete_selected(self) -> None:
-        video = self._current_video()
-        if not video:
-            return
-        try:
-            send2trash(video.file_path)
-        except Exception as exc:  # pragma: no cover - OS errors
-            QtWidgets.QMessageBox.warning(self, "Error", str(exc))
-            return
-        video.is_active = False
-        self.session.commit()
-        self.load_videos()
-
+        self._submit("delete", self._selected_ids())
+
+    def _on_job_progress(self, action: str, done: int, total: int) -> None:
+        self.progress.setRange(0, total)
+        self.progress.setValue(done)
+
+    @profiling.profiled("gui.on_job_finished")
+    def _on_job_finished(self, result) -> None:
+        self._set_busy(False)
+        self.statusBar().showMessage(
+            f"{result.action.capitalize()}: {len(result.done)} done, {len(result.errors)} failed",
+            5000,
+        )
+        self._reload()
+        if result.errors:
+            details = "\n".join(f"#{vid}: {msg}" for vid, msg in result.errors.items())
+            QtWidgets.QMessageBox.warning(self, "Error", details)
+
+    def _on_job_failed(self, action: str, message: str) -> None:
+        self._set_busy(False)
+        self.statusBar().clearMessage()
+        self._reload()
+        QtWidgets.QMessageBox.warning(self, "Error", message)
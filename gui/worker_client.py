@@ -0,0 +1,163 @@
+"""GUI side of the backend worker process (see ``backend.service``)."""
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import threading
+from typing import Sequence
+
+from PySide6 import QtCore
+
+from backend import service
+
+
+class WorkerClient(QtCore.QObject):
+    """Spawn the backend worker and talk to it over a pipe.
+
+    Offers the same ``submit``/``progress``/``finished``/``failed``/``wait``
+    surface as :class:`gui.jobs.JobRunner`, plus ``changed`` whenever the
+    worker commits. If the worker dies, in-flight jobs are failed and it is
+    restarted with exponential backoff; after ``MAX_RESTARTS`` attempts
+    without reaching "ready" it gives up and reports a ``"worker"`` failure.
+    The worker is started with ``spawn`` so it never inherits the GUI's Qt
+    state or open SQLite connections.
+    """
+
+    RESTART_DELAY_MS = 500
+    MAX_RESTART_DELAY_MS = 30_000
+    MAX_RESTARTS = 5
+
+    progress = QtCore.Signal(str, int, int)
+    finished = QtCore.Signal(object)
+    failed = QtCore.Signal(str, str)
+    changed = QtCore.Signal()
+    _lost = QtCore.Signal()
+
+    def __init__(self, settings_path: str = "settings.json", parent=None, target=None):
+        super().__init__(parent)
+        self.settings_path = settings_path
+        self.target = target or service.run_worker
+        self._ids = itertools.count(1)
+        self._pending: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._ready = threading.Event()
+        self._stopping = False
+        self._restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self.process: multiprocessing.Process | None = None
+        self.conn = None
+        self._lost.connect(self._on_lost)
+        self.start()
+
+    # Process lifecycle ---------------------------------------------------
+    def start(self) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        self.conn = parent_conn
+        self._ready.clear()
+        self.process = self._context.Process(
+            target=self.target,
+            args=(child_conn, self.settings_path),
+            name="ig-backend",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        threading.Thread(target=self._reader, args=(parent_conn,), daemon=True).start()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        try:
+            self.conn.send({"cmd": "shutdown"})
+        except (OSError, EOFError):
+            pass
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.conn.close()
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    # Jobs --------------------------------------------------------------
+    def submit(self, action: str, video_ids: Sequence[int], **options) -> None:
+        if not video_ids:
+            return
+        job = next(self._ids)
+        with self._lock:
+            self._pending[job] = action
+        try:
+            self.conn.send({
+                "cmd": "bulk", "job": job, "action": action,
+                "ids": list(video_ids), "options": options,
+            })
+        except (OSError, EOFError) as exc:
+            self._finish(job)
+            self.failed.emit(action, f"Backend worker unavailable: {exc}")
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until every submitted job has reported back (like ``JobRunner.wait``)."""
+        timeout = None if msecs < 0 else msecs / 1000
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def _finish(self, job) -> str | None:
+        with self._idle:
+            action = self._pending.pop(job, None)
+            if not self._pending:
+                self._idle.notify_all()
+        return action
+
+    # Incoming events -----------------------------------------------------
+    def _reader(self, conn) -> None:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            kind = message.get("event")
+            if kind == "ready":
+                self._restarts = 0
+                self._ready.set()
+            elif kind == "changed":
+                self.changed.emit()
+            elif kind == "progress":
+                self.progress.emit(message["action"], message["done"], message["total"])
+            elif kind == "finished":
+                self.finished.emit(message["result"])
+                self._finish(message["job"])
+            elif kind == "failed":
+                self.failed.emit(message["action"], message["message"])
+                self._finish(message["job"])
+        if not self._stopping and conn is self.conn:
+            self._lost.emit()
+
+    def _on_lost(self) -> None:
+        with self._lock:
+            lost = list(self._pending.items())
+        if self.process is not None:
+            self.process.join(1)
+        code = self.process.exitcode if self.process is not None else None
+        giving_up = self._restarts >= self.MAX_RESTARTS
+        for job, action in lost:
+            self._finish(job)
+            self.failed.emit(action, f"Backend worker stopped unexpectedly (exit code {code}).")
+        if giving_up:
+            self.failed.emit(
+                "worker",
+                f"Backend worker failed to start {self._restarts + 1} times (exit code {code}); "
+                "check settings.json and the log, then restart the app.",
+            )
+            return
+        delay = min(self.RESTART_DELAY_MS * 2 ** self._restarts, self.MAX_RESTART_DELAY_MS)
+        self._restarts += 1
+        QtCore.QTimer.singleShot(delay, self._restart)
+
+    def _restart(self) -> None:
+        if not self._stopping:
+            self.start()
@@ -1,54 +1,61 @@
 """Entry point for the desktop application."""
-from PySide6 import QtWidgets
+import multiprocessing
 
+from PySide6 import QtCore, QtWidgets
 
-def _graceful_shutdown(app: QtWidgets.QApplication, sched, observer) -> None:
+
+def _graceful_shutdown(app: QtWidgets.QApplication, backend=None, worker=None) -> None:
     """Connect clean-up handlers to the Qt application."""
     def _on_quit():
-        if sched:
-            sched.shutdown(wait=False)
-        if observer:
-            observer.stop()
-            observer.join()
-        stop_http_server()
+        if backend:
+            backend.stop()
+        if worker:
+            worker.shutdown()
 
     app.aboutToQuit.connect(_on_quit)
 
 
-from backend import db, models, watcher, scheduler
-from backend.instagram import stop_http_server
+def _wake_for_signals(app: QtWidgets.QApplication) -> QtCore.QTimer:
+    """Run Python regularly so POSIX signal handlers (SIGUSR1) get a chance.
+
+    While ``app.exec()`` sits in Qt's event loop the interpreter never runs,
+    and Python only calls signal handlers between bytecodes.
+    """
+    timer = QtCore.QTimer(app)
+    timer.timeout.connect(lambda: None)
+    timer.start(250)
+    return timer
+
+
+from backend import db, models, service
 from gui.main_window import MainWindow
+from gui.worker_client import WorkerClient
 
 
 def main() -> None:
-    # Initialize database
-    models.Base.metadata.create_all(db.ENGINE)
-    session = next(db.get_session())
-
-    # Load settings
-    import json
-    with open("settings.json", "r") as f:
-        settings = json.load(f)
-    session.settings = settings
-
-    # Start folder watcher
-    if settings.get("watch_folder"):
-        observer = watcher.start_watcher(settings["watch_folder"], session)
+    settings = service.load_settings("settings.json")
+    app = QtWidgets.QApplication([])
+    _wake_for_signals(app)
+
+    if settings.get("worker_process"):
+        # Watcher, scheduler, posting and media server run in a child
+        # process; the GUI only reads the DB and sends commands.
+        models.Base.metadata.create_all(db.ENGINE)
+        session = next(db.get_session())
+        session.settings = settings
+        service.start_profiling(settings, "settings.json")
+        worker = WorkerClient("settings.json")
+        _graceful_shutdown(app, worker=worker)
+        win = MainWindow(session, None, jobs=worker, settings_path="settings.json")
     else:
-        observer = None
-
-    sched = scheduler.create_scheduler(
-        session,
-        settings.get("max_posts_per_day", 25),
-        settings.get("metrics_refresh_minutes", 30),
-    )
+        backend = service.start_backend(settings, "settings.json")
+        _graceful_shutdown(app, backend=backend)
+        win = MainWindow(backend.session, backend.scheduler, settings_path="settings.json")
 
-    app = QtWidgets.QApplication([])
-    _graceful_shutdown(app, sched, observer)
-    win = MainWindow(session, sched)
     win.show()
     app.exec()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # needed for the worker in PyInstaller builds
     main()
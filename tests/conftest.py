@@ -5,3 +5,15 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _fresh_credentials():
+    """Keep the in-memory token cache from leaking between tests."""
+    from backend import credentials
+
+    credentials.CREDENTIALS.invalidate()
+    yield
+    credentials.CREDENTIALS.invalidate()
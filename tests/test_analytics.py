@@ -0,0 +1,83 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pytz
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import analytics, timeseries
+from backend.models import Base, MetricSample, Video
+
+
+def create_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def _epoch(dt):
+    return int(dt.replace(tzinfo=pytz.utc).timestamp())
+
+
+def test_engagement_velocity_uses_first_window():
+    arrays = {
+        "video_id": np.array([1, 1, 1, 2, 2]),
+        "ts": np.array([0, 3600, 100 * 3600, 0, 7200]),
+        "likes": np.array([0, 10, 500, 4, 8]),
+        "comments": np.array([0, 2, 50, 0, 4]),
+        "views": np.zeros(5, dtype=np.int64),
+    }
+    ids, velocity = analytics.engagement_velocity(arrays, window_hours=24)
+    assert ids.tolist() == [1, 2]
+    assert velocity.tolist() == [12.0, 4.0]
+
+
+def test_post_stats_and_template():
+    session = create_session()
+    monday = datetime(2026, 1, 5)
+    for i, hour in enumerate([9, 9, 9, 18, 18, 18]):
+        posted = monday + timedelta(days=7 * i, hours=hour)
+        video = Video(file_path=f"{i}.mp4", sha256=str(i), posted_at=posted, insta_media_id=str(i))
+        session.add(video)
+        session.flush()
+        gain = 100 if hour == 18 else 10
+        timeseries.record_samples(
+            session, [{"video_id": video.id, "likes": gain, "comments": 0, "views": 0}],
+            ts=_epoch(posted) + 3600,
+        )
+    session.commit()
+
+    stats = analytics.post_stats(session, pytz.utc)
+    assert sorted(stats.velocity.tolist()) == [10.0] * 3 + [100.0] * 3
+    best = analytics.best_hours_of_week(stats, top=1)
+    assert best[0][:2] == (0, 18)
+    assert analytics.suggest_template(stats, slots=1) == [time(18, 0)]
+    assert analytics.suggest_template(stats, slots=5) == [time(9, 0), time(18, 0)]
+
+
+def test_downsample_keeps_newest_per_bucket():
+    session = create_session()
+    now = 10 * 86400
+    old = now - 5 * 86400
+    rows = [{"video_id": 1, "likes": 0, "comments": 0, "views": 0}]
+    for minute in range(0, 120, 30):
+        timeseries.record_samples(session, rows, ts=old + minute * 60)
+    timeseries.record_samples(session, rows, ts=now - 60)
+    session.commit()
+
+    deleted = timeseries.downsample(
+        session, [(timedelta(days=2), timedelta(hours=1))], now=now
+    )
+    remaining = sorted(s.ts for s in session.query(MetricSample))
+    assert deleted == 2
+    assert remaining == [old + 30 * 60, old + 90 * 60, now - 60]
+
+
+def test_hour_of_week_follows_dst():
+    berlin = pytz.timezone("Europe/Berlin")
+    winter = datetime(2026, 1, 5, 8)  # Monday, UTC+1
+    summer = datetime(2026, 7, 6, 8)  # Monday, UTC+2
+    ts = np.array([_epoch(winter), _epoch(summer)])
+    assert analytics.hour_of_week(ts, berlin).tolist() == [9, 10]
+    assert analytics.hour_of_week(ts, pytz.utc).tolist() == [8, 8]
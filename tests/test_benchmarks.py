@@ -0,0 +1,19 @@
+from benchmarks import harness
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": {"median": 1.0}, "b": {"median": 2.0}, "old": {"median": 1.0}}
+    current = {"a": {"median": 1.1}, "b": {"median": 3.0}, "new": {"median": 1.0}}
+
+    rows = {r["case"]: r for r in harness.compare(baseline, current, threshold=1.2)}
+
+    assert set(rows) == {"a", "b"}
+    assert rows["a"]["regression"] is False
+    assert rows["b"]["regression"] is True
+
+
+def test_baseline_round_trip(tmp_path):
+    path = tmp_path / "baseline.json"
+    results = {"case[1]": harness.measure(lambda: None, repeat=2)}
+    harness.save_baseline(results, path)
+    assert harness.load_baseline(path) == results
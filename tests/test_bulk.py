@@ -0,0 +1,124 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from backend import bulk, scheduler
+from backend.models import Base, Video
+
+
+def create_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def _videos(session, tmp_path, n):
+    videos = [Video(file_path=str(tmp_path / f"{i}.mp4"), sha256=str(i)) for i in range(n)]
+    session.add_all(videos)
+    session.commit()
+    return [v.id for v in videos]
+
+
+def test_bulk_delete_trashes_then_commits_once(monkeypatch, tmp_path):
+    session = create_session()
+    ids = _videos(session, tmp_path, 4)
+    for video in session.query(Video):
+        video.scheduled_at = datetime(2030, 1, 1)
+    session.commit()
+    trashed = []
+
+    def fake_trash(path):
+        if path.endswith("3.mp4"):
+            raise OSError("locked")
+        trashed.append(path)
+
+    monkeypatch.setattr(bulk.send2trash, "send2trash", fake_trash)
+    commits = []
+    event.listen(session, "after_commit", lambda s: commits.append(1))
+    progress = []
+
+    result = bulk.bulk_delete(session, ids, progress=lambda d, t: progress.append((d, t)))
+
+    assert len(commits) == 1
+    assert len(trashed) == 3
+    assert result.errors == {ids[3]: "locked"}
+    assert progress[-1] == (4, 4)
+    active = [v.id for v in session.query(Video).filter_by(is_active=True)]
+    assert active == [ids[3]]
+    assert session.query(Video).filter(Video.scheduled_at.isnot(None)).count() == 1
+
+
+def test_bulk_schedule_and_unschedule(tmp_path):
+    session = create_session()
+    ids = _videos(session, tmp_path, 3)
+    settings = {"timezone": "UTC", "max_posts_per_day": 25}
+
+    result = bulk.ACTIONS["schedule"](session, ids, template=[time(9, 0)], settings=settings)
+    assert result.done == ids
+    slots = [session.get(Video, i).scheduled_at for i in ids]
+    assert all(s > datetime.utcnow() for s in slots)
+    assert len(set(slots)) == 3
+
+    bulk.ACTIONS["unschedule"](session, ids[:2])
+    session.expire_all()
+    assert [session.get(Video, i).scheduled_at is None for i in ids] == [True, True, False]
+
+
+def test_bulk_post_skips_posted_and_respects_daily_limit(monkeypatch, tmp_path):
+    session = create_session()
+    session.settings = {"max_posts_per_day": 3}
+    ids = _videos(session, tmp_path, 5)
+    posted, gone = session.get(Video, ids[0]), session.get(Video, ids[1])
+    posted.posted_at, posted.insta_media_id = datetime.utcnow(), "keep"
+    gone.is_active = False
+    session.commit()
+
+    published = []
+    monkeypatch.setattr(bulk, "post_to_instagram", lambda s, v: published.append(v.id))
+    result = bulk.bulk_post(session, ids)
+
+    # One post today already, so two more fit under the limit of three.
+    assert published == ids[2:4]
+    assert result.done == ids[2:4]
+    assert list(result.errors) == [ids[4]]
+    assert posted.insta_media_id == "keep"
+
+
+def test_bulk_schedule_skips_posted_and_deleted(tmp_path):
+    session = create_session()
+    posted_id, gone_id, real_id = _videos(session, tmp_path, 3)
+    posted, gone = session.get(Video, posted_id), session.get(Video, gone_id)
+    posted.posted_at = datetime.utcnow() - timedelta(days=2)
+    gone.is_active = False
+    session.commit()
+    settings = {"timezone": "UTC", "max_posts_per_day": 1}
+
+    result = bulk.bulk_schedule(session, [posted_id, gone_id, real_id], template=[time(9, 0)], settings=settings)
+
+    assert result.done == [real_id]
+    assert set(result.errors) == {posted_id, gone_id}
+    session.expire_all()
+    assert posted.scheduled_at is None and gone.scheduled_at is None
+    # The first free 09:00 slot, not pushed back by the skipped videos.
+    assert session.get(Video, real_id).scheduled_at <= datetime.utcnow() + timedelta(days=1)
+
+
+def test_bulk_post_holds_post_lock_and_rechecks(monkeypatch, tmp_path):
+    session = create_session()
+    session.settings = {"max_posts_per_day": 25}
+    ids = _videos(session, tmp_path, 2)
+    locked = []
+
+    def fake_post(s, video):
+        locked.append(scheduler._POST_LOCK.locked())
+        # The scheduler publishes the other video meanwhile.
+        s.execute(update(Video).where(Video.id == ids[1]).values(posted_at=datetime.utcnow()))
+
+    monkeypatch.setattr(bulk, "post_to_instagram", fake_post)
+    result = bulk.bulk_post(session, ids)
+
+    assert locked == [True]
+    assert result.done == [ids[0]]
+    assert result.errors == {ids[1]: "Already posted or deleted"}
@@ -0,0 +1,63 @@
+import time
+from types import SimpleNamespace
+
+from backend import credentials
+
+
+class FakeKeyring:
+    def __init__(self, **values):
+        self.values = values
+        self.reads = 0
+
+    def get_password(self, service, key):
+        self.reads += 1
+        return self.values.get(key)
+
+    def set_password(self, service, key, value):
+        self.values[key] = value
+
+    def delete_password(self, service, key):
+        self.values.pop(key, None)
+
+
+def test_token_is_cached_until_ttl(monkeypatch):
+    fake = FakeKeyring(long_lived_token="abc")
+    monkeypatch.setattr(credentials, "keyring", fake)
+    manager = credentials.CredentialManager(ttl=60)
+
+    assert manager.get_token() == "abc"
+    assert manager.get_token() == "abc"
+    reads = fake.reads
+
+    fake.values["long_lived_token"] = "new"
+    assert manager.get_token() == "abc"
+    manager.invalidate()
+    assert manager.get_token() == "new"
+    assert fake.reads > reads
+
+
+def test_refresh_when_close_to_expiry(monkeypatch):
+    soon = str(int(time.time() + 3600))
+    fake = FakeKeyring(long_lived_token="old", long_lived_token_expires_at=soon, app_secret="s")
+    monkeypatch.setattr(credentials, "keyring", fake)
+    calls = []
+
+    def fake_get(url, params=None, timeout=None):
+        calls.append((url, params))
+        return SimpleNamespace(
+            raise_for_status=lambda: None,
+            json=lambda: {"access_token": "fresh", "expires_in": 60 * 86400},
+        )
+
+    monkeypatch.setattr(credentials.requests, "get", fake_get)
+    manager = credentials.CredentialManager()
+
+    assert manager.refresh_if_needed({"app_id": "42"}, "http://api") is True
+    assert calls[0][0] == "http://api/oauth/access_token"
+    assert calls[0][1]["fb_exchange_token"] == "old"
+    assert manager.get_token() == "fresh"
+    assert fake.values["long_lived_token"] == "fresh"
+    assert manager.expires_at > time.time() + 59 * 86400
+
+    # Far from expiry now: nothing to do.
+    assert manager.refresh_if_needed({"app_id": "42"}, "http://api") is False
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from backend import credentials, instagram
+from benchmarks.graph_sim import GraphAPISimulator, SimulatorConfig
+
+
+def _post(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(name.encode())
+    session = SimpleNamespace(settings={"instagram_user_id": "1"})
+    video = SimpleNamespace(file_path=str(path), title=name, description="", insta_media_id=None)
+    instagram.post_to_instagram(session, video)
+    return video
+
+
+def test_post_through_simulator(monkeypatch, tmp_path):
+    monkeypatch.setattr(credentials.keyring, "get_password", lambda *a, **k: "token")
+    sim = GraphAPISimulator(SimulatorConfig(processing_time=0.1, publish_limit=1))
+    with sim, sim.attached(poll_seconds=0.02):
+        video = _post(tmp_path, "a.mp4")
+        assert video.insta_media_id
+        assert instagram.API == sim.url
+
+        with pytest.raises(requests.HTTPError):
+            _post(tmp_path, "b.mp4")
+
+        metrics = requests.get(
+            f"{sim.url}/{video.insta_media_id}",
+            params={"fields": "like_count", "access_token": "token"},
+        ).json()
+        assert "like_count" in metrics
+    instagram.stop_http_server()
+
+    assert instagram.API == instagram.DEFAULT_API
+    assert sim.stats["publish_limited"] == 1
+    assert sim.fetched_bytes == len(b"a.mp4") + len(b"b.mp4")
+
+
+def test_simulator_errors_and_rate_limit(monkeypatch, tmp_path):
+    monkeypatch.setattr(credentials.keyring, "get_password", lambda *a, **k: "token")
+    sim = GraphAPISimulator(SimulatorConfig(error_rate=1.0, fetch_media=False, rate_limit_calls=2))
+    with sim, sim.attached(poll_seconds=0.0):
+        with pytest.raises(RuntimeError, match="processing failed"):
+            _post(tmp_path, "a.mp4")
+        r = requests.get(f"{sim.url}/1/content_publishing_limit", params={"access_token": "t"})
+        assert r.status_code == 400
+        assert r.json()["error"]["code"] == 4
+        assert "call_count" in r.headers["X-App-Usage"]
+    instagram.stop_http_server()
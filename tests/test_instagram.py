@@ -1,5 +1,5 @@
 import urllib.request
-from backend import instagram
+from backend import credentials, instagram
 
 
 def test_local_http_url(tmp_path):
@@ -16,7 +16,7 @@ def test_local_http_url(tmp_path):
 import json
 from types import SimpleNamespace
 
-from backend.models import Base, Video
+from backend.models import Base, MetricSample, Video
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -36,7 +36,7 @@ def test_post_to_instagram(monkeypatch):
     session.settings = {"instagram_user_id": "1"}
 
     # Fake credentials
-    monkeypatch.setattr(instagram.keyring, "get_password", lambda *a, **k: "token")
+    monkeypatch.setattr(credentials.keyring, "get_password", lambda *a, **k: "token")
 
     def fake_local(url):
         return "http://local/file.mp4"
@@ -53,9 +53,9 @@ def test_post_to_instagram(monkeypatch):
         else:
             return SimpleNamespace(json=lambda: {"id": "container1"}, raise_for_status=lambda: None)
 
-    def fake_get(url, params=None):
+    def fake_get(url, params=None, timeout=None):
         gets.append((url, params))
-        return SimpleNamespace(json=lambda: {"status_code": "FINISHED"})
+        return SimpleNamespace(json=lambda: {"status_code": "FINISHED"}, raise_for_status=lambda: None)
 
     monkeypatch.setattr(instagram.requests, "post", fake_post)
     monkeypatch.setattr(instagram.requests, "get", fake_get)
@@ -73,7 +73,7 @@ def test_refresh_metrics(monkeypatch):
     session.commit()
     session.settings = {"instagram_user_id": "1"}
 
-    monkeypatch.setattr(instagram.keyring, "get_password", lambda *a, **k: "token")
+    monkeypatch.setattr(credentials.keyring, "get_password", lambda *a, **k: "token")
 
     def fake_get(url, params=None):
         return SimpleNamespace(json=lambda: {"like_count": 1, "comments_count": 2, "video_view_count": 3})
@@ -83,3 +83,5 @@ def test_refresh_metrics(monkeypatch):
     instagram.refresh_metrics(session)
     updated = session.get(Video, vid.id)
     assert updated.likes == 1 and updated.comments == 2 and updated.views == 3
+    sample = session.query(MetricSample).one()
+    assert (sample.video_id, sample.likes, sample.views) == (vid.id, 1, 3)
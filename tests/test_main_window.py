@@ -2,17 +2,24 @@ import os
 import pytest
 
 try:
-    from PySide6 import QtWidgets
+    from PySide6 import QtCore, QtWidgets
     from gui.main_window import MainWindow
     from backend.models import Base, Video
     from sqlalchemy import create_engine
     from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
 except Exception:  # pragma: no cover - missing Qt deps
     QtWidgets = None
 
 
 def create_session():
-    engine = create_engine("sqlite:///:memory:", future=True)
+    # Bulk actions run on a worker thread, so share one in-memory connection.
+    engine = create_engine(
+        "sqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     Base.metadata.create_all(engine)
     Session = sessionmaker(bind=engine)
     return Session()
@@ -37,5 +44,66 @@ def test_main_window_load_and_delete(monkeypatch, tmp_path):
     item = win.tree.topLevelItem(0)
     win.tree.setCurrentItem(item)
     win.delete_selected()
+    win.jobs.wait()
+    app.processEvents()
 
     assert session.get(Video, video.id).is_active is False
+    assert win.tree.topLevelItemCount() == 0
+
+
+@pytest.mark.skipif(QtWidgets is None, reason="PySide6 not available")
+def test_main_window_bulk_unschedule(monkeypatch, tmp_path):
+    from datetime import datetime
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    session = create_session()
+    when = datetime(2030, 1, 1, 9, 0)
+    videos = [
+        Video(file_path=str(tmp_path / f"{i}.mp4"), sha256=str(i), scheduled_at=when)
+        for i in range(3)
+    ]
+    session.add_all(videos)
+    session.commit()
+
+    win = MainWindow(session, scheduler=None)
+    win.tree.selectAll()
+    assert len(win._selected_ids()) == 3
+
+    win.unschedule_selected()
+    win.jobs.wait()
+    app.processEvents()
+
+    assert all(session.get(Video, v.id).scheduled_at is None for v in videos)
+
+
+@pytest.mark.skipif(QtWidgets is None, reason="PySide6 not available")
+def test_main_window_saves_template(monkeypatch, tmp_path):
+    import json
+    from datetime import time
+
+    from gui import main_window
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"timezone": "UTC"}))
+
+    class FakeDialog:
+        def __init__(self, template, parent=None):
+            self.schedule_template = [time(9, 0), time(18, 30)]
+
+        def exec(self):
+            return True
+
+    monkeypatch.setattr(main_window, "ScheduleDialog", FakeDialog)
+    session = create_session()
+    session.settings = {"timezone": "UTC"}
+    win = MainWindow(session, scheduler=None, settings_path=str(path))
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+
+    assert win._ask_template() == [time(9, 0), time(18, 30)]
+    assert json.loads(path.read_text()) == {"timezone": "UTC", "schedule_template": ["09:00", "18:30"]}
+    assert win._default_template() == [time(9, 0), time(18, 30)]
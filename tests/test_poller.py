@@ -0,0 +1,96 @@
+from backend import watcher
+
+
+class RecordingHandler(watcher.FolderHandler):
+    def __init__(self, root, **kwargs):
+        super().__init__(session_factory=None, root=root, **kwargs)
+        self.seen = []
+
+    def _ingest(self, path):
+        if self.accepts(path):
+            self.seen.append(path.relative_to(self.root).as_posix())
+
+
+def test_poller_finds_files_in_new_subfolders(tmp_path):
+    (tmp_path / "old.mp4").write_bytes(b"x")
+    handler = RecordingHandler(tmp_path, exclude=["*.part", "tmp/*"])
+    poller = watcher.StatDiffPoller()
+    poller.schedule(handler, str(tmp_path), recursive=True)
+    poller.prime()
+
+    day = tmp_path / "2026-10-19" / "cam-a"
+    day.mkdir(parents=True)
+    (day / "clip.mp4").write_bytes(b"1")
+    (day / "clip.mp4.part").write_bytes(b"1")
+    (tmp_path / "tmp").mkdir()
+    (tmp_path / "tmp" / "skip.mp4").write_bytes(b"1")
+
+    poller.poll()  # discovered, waiting for the size to settle
+    assert handler.seen == []
+    poller.poll()
+    assert handler.seen == ["2026-10-19/cam-a/clip.mp4"]
+
+    poller.poll()  # nothing new
+    assert handler.seen == ["2026-10-19/cam-a/clip.mp4"]
+
+
+def test_poller_waits_for_growing_files(tmp_path):
+    handler = RecordingHandler(tmp_path)
+    poller = watcher.StatDiffPoller()
+    poller.schedule(handler, str(tmp_path), recursive=True)
+    poller.prime()
+
+    clip = tmp_path / "big.mov"
+    clip.write_bytes(b"1")
+    poller.poll()
+    clip.write_bytes(b"12345")
+    poller.poll()
+    assert handler.seen == []
+    poller.poll()
+    assert handler.seen == ["big.mov"]
+
+
+def test_poller_recovers_after_share_disconnect(tmp_path):
+    share = tmp_path / "share"
+    (share / "cam").mkdir(parents=True)
+    (share / "cam" / "old.mp4").write_bytes(b"x")
+    handler = RecordingHandler(share)
+    poller = watcher.StatDiffPoller()
+    poller.schedule(handler, str(share), recursive=True)
+    poller.prime()
+
+    share.rename(tmp_path / "away")  # the mount drops for a round
+    poller.poll()
+    (tmp_path / "away").rename(share)
+    (share / "cam" / "new.mp4").write_bytes(b"1")
+
+    poller.poll()
+    poller.poll()
+    assert handler.seen == ["cam/new.mp4"]
+
+
+def test_poller_picks_up_root_mounted_after_start(tmp_path):
+    share = tmp_path / "share"
+    handler = RecordingHandler(share)
+    poller = watcher.StatDiffPoller()
+    poller.schedule(handler, str(share), recursive=True)
+    poller.prime()
+    poller.poll()
+
+    share.mkdir()
+    (share / "clip.mp4").write_bytes(b"1")
+    poller.poll()
+    poller.poll()
+    assert handler.seen == ["clip.mp4"]
+
+
+def test_roots_from_settings(tmp_path):
+    settings = {
+        "watch_folder": str(tmp_path),
+        "watch_roots": [{"path": "/share", "include": ["*.mp4"], "poll": True, "poll_interval": 30}],
+    }
+    roots = watcher.roots_from_settings(settings)
+    assert [r.path for r in roots] == ["/share", str(tmp_path)]
+    assert roots[0].use_polling() and roots[0].recursive
+    assert roots[1].recursive is False
+    assert watcher.is_network_path(str(tmp_path)) is False
@@ -0,0 +1,91 @@
+import json
+import os
+import pstats
+import signal
+import time
+
+import pytest
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+from backend import profiling
+
+
+def test_profiled_call_writes_profile_and_sql(tmp_path):
+    engine = create_engine("sqlite:///:memory:", future=True)
+
+    @profiling.profiled("inner")
+    def inner(conn):
+        return conn.execute(text("SELECT 1")).scalar()
+
+    @profiling.profiled("job.outer")
+    def outer():
+        with engine.connect() as conn:
+            return inner(conn) + inner(conn)
+
+    assert outer() == 2
+    assert list(tmp_path.iterdir()) == []
+    assert not event.contains(Engine, "after_cursor_execute", profiling._after_execute)
+
+    profiling.enable(str(tmp_path))
+    try:
+        assert outer() == 2
+    finally:
+        profiling.disable()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert len(files) == 2  # nested profiled calls share the outer dump
+    prof = next(tmp_path.glob("*job_outer.prof"))
+    assert pstats.Stats(str(prof)).total_calls > 0
+    report = json.loads(next(tmp_path.glob("*job_outer.sql.json")).read_text())
+    assert report["name"] == "job.outer"
+    assert report["statements"][0]["sql"] == "SELECT 1"
+    assert report["statements"][0]["count"] == 2
+    assert not event.contains(Engine, "before_cursor_execute", profiling._before_execute)
+
+
+def test_dumps_rotate_and_toggle(tmp_path):
+    @profiling.profiled("tick")
+    def tick():
+        return sum(range(100))
+
+    profiling.enable(str(tmp_path), keep=3)
+    try:
+        for _ in range(5):
+            tick()
+        assert len(list(tmp_path.glob("*.prof"))) == 3
+        assert profiling.toggle() is False
+        tick()
+        assert len(list(tmp_path.glob("*.prof"))) == 3
+        assert profiling.toggle() is True
+    finally:
+        profiling.disable()
+    assert not profiling.ENABLED
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="POSIX only")
+def test_sigusr1_toggle_is_applied_outside_the_handler(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "_directory", tmp_path)
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert profiling.install_signal_handler(poll=0.01)
+        # A signal arriving while enable()/disable() holds the lock must not deadlock.
+        with profiling._lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.05)
+            assert not profiling.ENABLED
+        _wait_for(lambda: profiling.ENABLED)
+
+        os.kill(os.getpid(), signal.SIGUSR1)
+        _wait_for(lambda: not profiling.ENABLED)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+        profiling.disable()
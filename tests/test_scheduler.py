@@ -1,3 +1,5 @@
+import json
+import os
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -35,10 +37,162 @@ def test_post_due_videos(monkeypatch):
     assert v2.posted_at is None
 
 
+def test_post_due_videos_skips_deleted(monkeypatch):
+    session = create_session()
+    now = datetime.utcnow() - timedelta(hours=1)
+    gone = [Video(file_path=f"{i}.mp4", sha256=str(i), scheduled_at=now, is_active=False) for i in range(2)]
+    real = Video(file_path="real.mp4", sha256="real", scheduled_at=now + timedelta(minutes=1))
+    session.add_all(gone + [real])
+    session.commit()
+
+    posted = []
+    monkeypatch.setattr(scheduler, "post_to_instagram", lambda s, v: posted.append(v.id))
+    scheduler.post_due_videos(session, max_posts_per_day=2)
+
+    assert posted == [real.id]
+
+
 def test_create_scheduler_uses_refresh_interval():
     session = create_session()
     sched = scheduler.create_scheduler(session, 1, metrics_refresh_minutes=42)
-    # Find the refresh_metrics job
-    job = next(j for j in sched.get_jobs() if j.func == scheduler.refresh_metrics)
+    job = sched.get_job("refresh_metrics")
     assert job.trigger.interval.total_seconds() == 42 * 60
+    assert job.coalesce
+    sched.shutdown(wait=False)
+
+
+def test_persistent_jobs_keep_next_run_time(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", future=True)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.settings = {"persist_jobs": True, "misfire_grace_seconds": 60}
+
+    sched = scheduler.create_scheduler(session, 5, metrics_refresh_minutes=30)
+    next_run = sched.get_job("refresh_metrics").next_run_time
     sched.shutdown(wait=False)
+
+    session.settings["misfire_grace_seconds"] = 120
+    sched = scheduler.create_scheduler(session, 5, metrics_refresh_minutes=30)
+    job = sched.get_job("refresh_metrics")
+    assert job.next_run_time == next_run
+    assert job.misfire_grace_time == 120
+    sched.shutdown(wait=False)
+
+    sched = scheduler.create_scheduler(session, 5, metrics_refresh_minutes=10)
+    assert sched.get_job("refresh_metrics").trigger.interval.total_seconds() == 600
+    assert len(sched.get_jobs()) == 5
+    sched.shutdown(wait=False)
+
+
+def test_spread_overdue_keeps_order():
+    session = create_session()
+    now = datetime(2030, 1, 1, 12, 0)
+    videos = [
+        Video(file_path=f"{i}.mp4", sha256=str(i), scheduled_at=now - timedelta(hours=5 - i))
+        for i in range(4)
+    ]
+    recent = Video(file_path="r.mp4", sha256="r", scheduled_at=now - timedelta(minutes=1))
+    session.add_all(videos + [recent])
+    session.commit()
+
+    moved = scheduler.spread_overdue(session, timedelta(minutes=60), timedelta(minutes=5), now=now)
+
+    assert moved == [v.id for v in videos]
+    session.expire_all()
+    assert [v.scheduled_at for v in videos] == [now + timedelta(minutes=15 * i) for i in range(4)]
+    assert recent.scheduled_at == now - timedelta(minutes=1)
+
+
+def test_spread_overdue_leaves_spread_deleted_and_over_quota_posts():
+    session = create_session()
+    now = datetime(2030, 1, 1, 12, 0)
+    videos = [
+        Video(file_path=f"{i}.mp4", sha256=str(i), scheduled_at=now - timedelta(hours=5 - i))
+        for i in range(5)
+    ]
+    videos[1].is_active = False
+    session.add_all(videos)
+    session.commit()
+    original = [v.scheduled_at for v in videos]
+
+    moved = scheduler.spread_overdue(
+        session, timedelta(minutes=60), timedelta(minutes=5), now=now, limit=2, skip={videos[0].id}
+    )
+
+    assert moved == [videos[2].id, videos[3].id]
+    session.expire_all()
+    assert [v.scheduled_at for v in videos] == [
+        original[0], original[1], now, now + timedelta(minutes=30), original[4],
+    ]
+    # Once the spread posts are late again (quota, failures) they stay put.
+    later = now + timedelta(hours=2)
+    skip = set(moved) | {videos[0].id}
+    assert scheduler.spread_overdue(
+        session, timedelta(minutes=60), timedelta(minutes=5), now=later, limit=2, skip=skip
+    ) == []
+
+
+def test_run_post_due_reads_settings(monkeypatch):
+    session = create_session()
+    now = datetime.utcnow()
+    session.add_all(
+        Video(file_path=f"{i}.mp4", sha256=str(i), scheduled_at=now - timedelta(seconds=30))
+        for i in range(3)
+    )
+    session.commit()
+    session.settings = {"max_posts_per_day": 2}
+    posted = []
+    monkeypatch.setattr(scheduler, "post_to_instagram", lambda s, v: posted.append(v.id))
+    monkeypatch.setattr(scheduler, "_CONTEXT", {"session": session, "max_posts_per_day": 1})
+
+    scheduler.run_post_due()
+
+    assert len(posted) == 2
+
+
+def test_run_post_due_picks_up_settings_file_changes(monkeypatch, tmp_path):
+    session = create_session()
+    now = datetime.utcnow()
+    session.add_all(
+        Video(file_path=f"{i}.mp4", sha256=str(i), scheduled_at=now - timedelta(seconds=30))
+        for i in range(3)
+    )
+    session.commit()
+    session.settings = {"max_posts_per_day": 1}
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"max_posts_per_day": 1}))
+    posted = []
+    monkeypatch.setattr(scheduler, "post_to_instagram", lambda s, v: posted.append(v.id))
+    monkeypatch.setattr(
+        scheduler, "_CONTEXT", {"session": session, "max_posts_per_day": 1, "settings_path": str(path)}
+    )
+
+    scheduler.run_post_due()
+    assert len(posted) == 1
+
+    path.write_text(json.dumps({"max_posts_per_day": 3}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    scheduler.run_post_due()
+    assert len(posted) == 3
+    assert session.settings["max_posts_per_day"] == 3
+
+
+def test_run_post_due_does_not_spread_without_allowance(monkeypatch):
+    session = create_session()
+    now = datetime.utcnow()
+    session.add(Video(file_path="p.mp4", sha256="p", posted_at=now))
+    late = [
+        Video(file_path=f"{i}.mp4", sha256=str(i), scheduled_at=now - timedelta(hours=3 - i))
+        for i in range(2)
+    ]
+    session.add_all(late)
+    session.commit()
+    original = [v.scheduled_at for v in late]
+    session.settings = {"max_posts_per_day": 1}
+    monkeypatch.setattr(scheduler, "_CONTEXT", {"session": session, "max_posts_per_day": 1})
+
+    scheduler.run_post_due()
+
+    session.expire_all()
+    assert [v.scheduled_at for v in late] == original
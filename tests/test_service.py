@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import service
+from backend.bulk import BulkResult
+from backend.models import Base, Video
+
+
+def create_factory():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+def _recv_until(conn, kind, timeout=5):
+    seen = []
+    while conn.poll(timeout):
+        message = conn.recv()
+        seen.append(message)
+        if message.get("event") == kind:
+            return message, seen
+    raise AssertionError(f"no {kind!r} event, got {seen}")
+
+
+def test_worker_service_runs_bulk_commands():
+    factory = create_factory()
+    session = factory()
+    videos = [Video(file_path=f"{i}.mp4", sha256=str(i), scheduled_at=datetime(2030, 1, 1)) for i in range(3)]
+    session.add_all(videos)
+    session.commit()
+    ids = [v.id for v in videos]
+
+    gui, worker = multiprocessing.Pipe()
+    svc = service.WorkerService(worker, {}, session_factory=factory)
+    thread = threading.Thread(target=svc.serve, daemon=True)
+    thread.start()
+
+    _recv_until(gui, "ready")
+    gui.send({"cmd": "ping"})
+    _recv_until(gui, "pong")
+
+    gui.send({"cmd": "bulk", "job": 7, "action": "unschedule", "ids": ids, "options": {}})
+    finished, seen = _recv_until(gui, "finished")
+    assert finished["job"] == 7
+    assert isinstance(finished["result"], BulkResult)
+    assert finished["result"].done == ids
+    assert any(m.get("event") == "progress" for m in seen)
+    # The commit notification may overtake the result.
+    if not any(m.get("event") == "changed" for m in seen):
+        _recv_until(gui, "changed")
+
+    gui.send({"cmd": "bulk", "job": 8, "action": "nope", "ids": ids})
+    failed, _ = _recv_until(gui, "failed")
+    assert failed["job"] == 8
+
+    gui.send({"cmd": "shutdown"})
+    thread.join(5)
+    assert not thread.is_alive()
+
+    session.expire_all()
+    assert all(session.get(Video, i).scheduled_at is None for i in ids)
+
+
+def test_worker_service_ignores_commits_that_wrote_nothing():
+    factory = create_factory()
+    gui, worker = multiprocessing.Pipe()
+    svc = service.WorkerService(worker, {}, session_factory=factory)
+    thread = threading.Thread(target=svc.serve, daemon=True)
+    thread.start()
+    _recv_until(gui, "ready")
+
+    with factory() as session:
+        session.query(Video).all()
+        session.commit()
+    assert not gui.poll(1.5)
+
+    with factory() as session:
+        session.add(Video(file_path="a.mp4", sha256="a"))
+        session.commit()
+    _recv_until(gui, "changed")
+
+    gui.send({"cmd": "shutdown"})
+    thread.join(5)
+
+
+def _fake_worker(conn, settings_path):
+    conn.send({"event": "ready"})
+    while True:
+        message = conn.recv()
+        if message["cmd"] == "shutdown":
+            return
+        if message["action"] == "crash":
+            os._exit(1)
+        conn.send({"event": "finished", "job": message["job"],
+                   "result": BulkResult(message["action"], message["ids"])})
+
+
+def _process_until(app, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def test_worker_client_restarts_lost_worker():
+    pytest.importorskip("PySide6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import QtWidgets
+    from gui.worker_client import WorkerClient
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    client = WorkerClient("unused.json", target=_fake_worker)
+    client.RESTART_DELAY_MS = 10
+    finished, failed = [], []
+    client.finished.connect(finished.append)
+    client.failed.connect(lambda action, msg: failed.append(action))
+    try:
+        assert client.wait_ready(5)
+        client.submit("unschedule", [1, 2])
+        assert client.wait(5000)
+        _process_until(app, lambda: finished)
+        assert finished[0].done == [1, 2]
+
+        first = client.process
+        client.submit("crash", [1])
+        _process_until(app, lambda: failed)
+        assert failed == ["crash"]
+        _process_until(app, lambda: client.process is not first)
+        assert client.process is not first
+        assert client.wait_ready(5)
+    finally:
+        client.shutdown()
+
+
+def _dead_worker(conn, settings_path):
+    raise SystemExit(3)  # e.g. unreadable settings.json
+
+
+def test_worker_client_gives_up_after_repeated_failures():
+    pytest.importorskip("PySide6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import QtWidgets
+    from gui.worker_client import WorkerClient
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    client = WorkerClient("unused.json", target=_dead_worker)
+    client.RESTART_DELAY_MS = 10
+    client.MAX_RESTARTS = 2
+    failed = []
+    client.failed.connect(lambda action, msg: failed.append((action, msg)))
+    try:
+        _process_until(app, lambda: failed, timeout=30)
+        assert failed[0][0] == "worker"
+        assert "exit code 3" in failed[0][1]
+        assert client._restarts == 2
+        assert not client.alive
+    finally:
+        client.shutdown()
+
+
+def test_update_settings_keeps_other_keys(tmp_path):
+    import json
+
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"timezone": "UTC", "profiling_enabled": True}))
+    service.update_settings(str(path), schedule_template=["09:00"])
+    assert json.loads(path.read_text()) == {
+        "timezone": "UTC", "profiling_enabled": True, "schedule_template": ["09:00"],
+    }
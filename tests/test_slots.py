@@ -0,0 +1,87 @@
+import time as time_module
+from datetime import datetime, time, timedelta
+
+import pytest
+import pytz
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import slots, timezones
+from backend.models import Base, Video
+
+
+def create_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    return Session()
+
+
+def test_allocate_skips_past_occupied_and_full_days():
+    now = datetime(2026, 3, 2, 10, 0)  # Monday 10:00 UTC
+    template = [time(9, 0), time(12, 0), time(18, 0)]
+    occupied = [datetime(2026, 3, 2, 12, 0)]
+
+    result = slots.allocate_slots(4, template, pytz.utc, 2, occupied, now)
+
+    # 09:00 has passed and 12:00 is taken; the day then hits its quota of 2.
+    assert result == [
+        datetime(2026, 3, 2, 18, 0),
+        datetime(2026, 3, 3, 9, 0),
+        datetime(2026, 3, 3, 12, 0),
+        datetime(2026, 3, 4, 9, 0),
+    ]
+
+
+def test_allocate_uses_local_wall_time_across_dst():
+    tz = pytz.timezone("America/New_York")
+    now = datetime(2026, 3, 7, 12, 0)  # DST starts on 8 March
+    result = slots.allocate_slots(2, [time(9, 0)], tz, 5, now=now)
+    assert result == [datetime(2026, 3, 7, 14, 0), datetime(2026, 3, 8, 13, 0)]
+
+
+def test_schedule_backlog_bulk_assigns_future_slots():
+    session = create_session()
+    now = datetime(2026, 3, 2, 10, 0)
+    videos = [Video(file_path=f"{i}.mp4", sha256=str(i), created_at=now + timedelta(seconds=i)) for i in range(5)]
+    videos.append(Video(file_path="s.mp4", sha256="s", scheduled_at=datetime(2026, 3, 2, 18, 0)))
+    session.add_all(videos)
+    session.commit()
+
+    settings = {"timezone": "UTC", "max_posts_per_day": 2}
+    assignment = slots.schedule_backlog(session, [time(9, 0), time(18, 0)], settings, now=now)
+
+    assert len(assignment) == 5
+    assert slots.unscheduled_backlog(session) == []
+    got = [session.get(Video, v.id).scheduled_at for v in videos[:5]]
+    assert got == [
+        datetime(2026, 3, 3, 9, 0),
+        datetime(2026, 3, 3, 18, 0),
+        datetime(2026, 3, 4, 9, 0),
+        datetime(2026, 3, 4, 18, 0),
+        datetime(2026, 3, 5, 9, 0),
+    ]
+
+
+@pytest.mark.skipif(not hasattr(time_module, "tzset"), reason="needs time.tzset")
+@pytest.mark.parametrize("named", [True, False])
+def test_empty_timezone_follows_local_dst(monkeypatch, named):
+    # The machine's zone is New York; DST starts on 8 March.
+    monkeypatch.setenv("TZ", "America/New_York")
+    time_module.tzset()
+    if not named:
+        monkeypatch.setattr(timezones, "local_zone_name", lambda: None)
+    try:
+        session = create_session()
+        videos = [Video(file_path=f"{i}.mp4", sha256=str(i)) for i in range(2)]
+        session.add_all(videos)
+        session.commit()
+
+        settings = {"timezone": "", "max_posts_per_day": 1}
+        slots.schedule_videos(
+            session, [v.id for v in videos], [time(9, 0)], settings, now=datetime(2026, 3, 7, 12, 0)
+        )
+        assert [v.scheduled_at for v in videos] == [datetime(2026, 3, 7, 14, 0), datetime(2026, 3, 8, 13, 0)]
+    finally:
+        monkeypatch.undo()
+        time_module.tzset()
@@ -0,0 +1,119 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import credentials, instagram, staging
+from benchmarks.graph_sim import GraphAPISimulator, SimulatorConfig
+from backend.models import Base, StagedContainer, Video
+
+
+def create_session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.settings = {"instagram_user_id": "1"}
+    return session
+
+
+def _video(session, tmp_path, name, scheduled_at):
+    path = tmp_path / name
+    path.write_bytes(name.encode())
+    video = Video(file_path=str(path), sha256=name, title=name, scheduled_at=scheduled_at)
+    session.add(video)
+    session.commit()
+    return video
+
+
+def test_prestaged_container_publishes_with_one_call(monkeypatch, tmp_path):
+    monkeypatch.setattr(credentials.keyring, "get_password", lambda *a, **k: "token")
+    session = create_session()
+    now = datetime.utcnow()
+    soon = _video(session, tmp_path, "soon.mp4", now + timedelta(minutes=10))
+    later = _video(session, tmp_path, "later.mp4", now + timedelta(hours=3))
+
+    sim = GraphAPISimulator(SimulatorConfig(processing_time=0.05))
+    with sim, sim.attached(poll_seconds=0.02):
+        times = staging.stage_upcoming(session, timedelta(minutes=30), now=now)
+        assert times == [soon.scheduled_at]
+        staged = session.query(StagedContainer).one()
+        assert staged.video_id == soon.id
+
+        while staged.status != "FINISHED":
+            staging.refresh_staged(session, now)
+        creates = sim.stats["POST /{id}/media"]
+        status_checks = sim.stats["GET /{id}"]
+
+        instagram.post_to_instagram(session, soon)
+        session.commit()
+    instagram.stop_http_server()
+
+    assert soon.insta_media_id
+    assert sim.stats["POST /{id}/media"] == creates == 1
+    assert sim.stats["GET /{id}"] == status_checks
+    assert sim.stats["POST /{id}/media_publish"] == 1
+    assert session.query(StagedContainer).count() == 0
+    assert later.insta_media_id is None
+
+
+def test_stale_containers_are_prepared_again(monkeypatch, tmp_path):
+    session = create_session()
+    now = datetime(2030, 1, 1, 9, 0)
+    video = _video(session, tmp_path, "a.mp4", now + timedelta(minutes=5))
+    gone = _video(session, tmp_path, "b.mp4", None)
+    session.add_all([
+        StagedContainer(video_id=video.id, container_id="old", caption=instagram.caption_for(video),
+                        status="FINISHED", created_at=now - timedelta(hours=23, minutes=30)),
+        StagedContainer(video_id=gone.id, container_id="unscheduled", caption="", status="FINISHED",
+                        created_at=now),
+    ])
+    session.commit()
+    created = iter(["new-1", "new-2"])
+    monkeypatch.setattr(instagram, "create_container", lambda s, v: next(created))
+    monkeypatch.setattr(instagram, "container_status", lambda cid: "IN_PROGRESS")
+
+    staging.stage_upcoming(session, timedelta(minutes=30), now=now)
+    assert [s.container_id for s in session.query(StagedContainer)] == ["new-1"]
+
+    # Editing the caption invalidates the container too.
+    video.title = "edited"
+    session.commit()
+    staging.stage_upcoming(session, timedelta(minutes=30), now=now)
+    assert [s.container_id for s in session.query(StagedContainer)] == ["new-2"]
+
+
+def test_rejected_container_id_is_dropped(monkeypatch, tmp_path):
+    monkeypatch.setattr(credentials.keyring, "get_password", lambda *a, **k: "token")
+    session = create_session()
+    now = datetime.utcnow()
+    video = _video(session, tmp_path, "a.mp4", now + timedelta(minutes=10))
+    session.add(StagedContainer(video_id=video.id, container_id="unknown",
+                                caption=instagram.caption_for(video), created_at=now))
+    session.commit()
+
+    with GraphAPISimulator() as sim, sim.attached():
+        staging.stage_upcoming(session, timedelta(minutes=30), now=now)
+    instagram.stop_http_server()
+
+    staged = session.query(StagedContainer).one()
+    assert staged.container_id != "unknown"
+
+
+def test_uploads_run_outside_the_lock(monkeypatch, tmp_path):
+    session = create_session()
+    now = datetime(2030, 1, 1, 9, 0)
+    _video(session, tmp_path, "a.mp4", now + timedelta(minutes=5))
+    lock = threading.Lock()
+    held = []
+
+    def create(s, v):
+        held.append(lock.locked())
+        return "new"
+
+    monkeypatch.setattr(instagram, "create_container", create)
+    staging.stage_upcoming(session, timedelta(minutes=30), now=now, lock=lock)
+
+    assert held == [False]
+    assert session.query(StagedContainer).one().container_id == "new"
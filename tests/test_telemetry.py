@@ -0,0 +1,40 @@
+import json
+import urllib.request
+
+from backend import instagram, telemetry
+
+
+def test_disabled_records_nothing():
+    telemetry.reset()
+    with telemetry.span("hash"):
+        pass
+    telemetry.inc("ig_events", event="ingested")
+    assert "ig_stage_duration_seconds" not in telemetry.render_openmetrics()
+
+
+def test_metrics_endpoint_and_json_log(tmp_path):
+    log_path = tmp_path / "telemetry.log"
+    telemetry.reset()
+    telemetry.enable(str(log_path))
+    try:
+        with telemetry.span("hash", file="a.mp4"):
+            pass
+        telemetry.inc("ig_events", event="ingested")
+        telemetry.set_gauge("ig_queue_depth", 3)
+
+        port = instagram.start_http_server()
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+            assert resp.headers["Content-Type"].startswith("application/openmetrics-text")
+            text = resp.read().decode()
+    finally:
+        telemetry.disable()
+        instagram.stop_http_server()
+
+    assert 'ig_stage_duration_seconds_count{stage="hash"} 1' in text
+    assert 'ig_events_total{event="ingested"} 1' in text
+    assert "ig_queue_depth 3" in text
+    assert text.endswith("# EOF\n")
+
+    record = json.loads(log_path.read_text().splitlines()[0])
+    assert record["event"] == "span" and record["stage"] == "hash"
+    assert record["file"] == "a.mp4"
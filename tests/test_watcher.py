@@ -7,19 +7,19 @@ from backend import watcher
 from backend.models import Base, Video
 
 
-def create_session():
+def create_factory():
     engine = create_engine("sqlite:///:memory:", future=True)
     Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return sessionmaker(bind=engine)
 
 
 def test_on_created_adds_video(tmp_path):
-    session = create_session()
+    factory = create_factory()
+    session = factory()
     file_path = tmp_path / "test.mp4"
     file_path.write_text("data")
 
-    handler = watcher.FolderHandler(session)
+    handler = watcher.FolderHandler(factory)
     event = SimpleNamespace(src_path=str(file_path), is_directory=False)
     handler.on_created(event)
 
@@ -4,11 +4,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 
-def create_session():
+def create_factory():
     engine = create_engine("sqlite:///:memory:", future=True)
     Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return sessionmaker(bind=engine)
 
 
 class DummyObserver:
@@ -25,12 +24,61 @@ class DummyObserver:
 
 
 def test_start_watcher_monkeypatch(monkeypatch, tmp_path):
-    session = create_session()
+    factory = create_factory()
     dummy = DummyObserver()
     monkeypatch.setattr(watcher, "Observer", lambda: dummy)
 
-    obs = watcher.start_watcher(str(tmp_path), session)
+    obs = watcher.start_watcher(str(tmp_path), factory)
     assert obs is dummy
     assert dummy.started
     assert dummy.daemon
     assert dummy.scheduled[0][1] == str(tmp_path)
+
+
+def test_start_watchers_shares_one_observer(monkeypatch, tmp_path):
+    factory = create_factory()
+    dummy = DummyObserver()
+    monkeypatch.setattr(watcher, "Observer", lambda: dummy)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    roots = [
+        watcher.WatchRoot(str(tmp_path / "a"), poll=False),
+        watcher.WatchRoot(str(tmp_path / "b"), recursive=False, poll=False),
+    ]
+
+    group = watcher.start_watchers(roots, factory)
+    assert group.observers == [dummy]
+    assert dummy.started
+    assert [(p, r) for _, p, r in dummy.scheduled] == [
+        (str(tmp_path / "a"), True),
+        (str(tmp_path / "b"), False),
+    ]
+
+
+def test_start_watchers_shares_one_poller(monkeypatch, tmp_path):
+    factory = create_factory()
+    monkeypatch.setattr(watcher.StatDiffPoller, "start", lambda self: None)
+    roots = [
+        watcher.WatchRoot(str(tmp_path / "a"), poll=True, poll_interval=10.0),
+        watcher.WatchRoot(str(tmp_path / "b"), poll=True, poll_interval=4.0),
+    ]
+
+    group = watcher.start_watchers(roots, factory)
+    (poller,) = group.observers
+    assert isinstance(poller, watcher.StatDiffPoller)
+    assert poller.interval == 4.0
+    assert [path for _, path, _ in poller._watches] == [str(tmp_path / "a"), str(tmp_path / "b")]
+
+
+def test_start_watchers_skips_missing_native_root(monkeypatch, tmp_path):
+    factory = create_factory()
+    dummy = DummyObserver()
+    monkeypatch.setattr(watcher, "Observer", lambda: dummy)
+    roots = [
+        watcher.WatchRoot(str(tmp_path / "missing"), poll=False),
+        watcher.WatchRoot(str(tmp_path), poll=False),
+    ]
+
+    group = watcher.start_watchers(roots, factory)
+    assert group.observers == [dummy]
+    assert [p for _, p, _ in dummy.scheduled] == [str(tmp_path)]